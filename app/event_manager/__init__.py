@@ -1 +1,9 @@
-from . import agent
\ No newline at end of file
+import importlib
+
+
+def __getattr__(name):
+    # The agent imports google.adk, which takes seconds, so it is only loaded
+    # when first used, e.g. by the server's runtime loader or `adk web`
+    if name == "agent":
+        return importlib.import_module(".agent", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
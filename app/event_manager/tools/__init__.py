@@ -1,9 +1,22 @@
 from .utils import get_current_time
+from .executor import run_in_executor
 from .create_event import create_event
 from .delete_event import delete_event
 from .edit_event import edit_event
 from .list_event import list_event
 from .find_free_time import find_free_time
+from .suggest_slots import suggest_slots
+from .batch_events import batch_events
+
+# Calendar tools make blocking HTTP calls, so the agent gets async versions
+# that run on the bounded tool executor instead of the event loop
+create_event = run_in_executor(create_event)
+delete_event = run_in_executor(delete_event)
+edit_event = run_in_executor(edit_event)
+list_event = run_in_executor(list_event)
+find_free_time = run_in_executor(find_free_time)
+suggest_slots = run_in_executor(suggest_slots)
+batch_events = run_in_executor(batch_events)
 
 __all__ = [
     "create_event",
@@ -11,5 +24,7 @@ __all__ = [
     "edit_event",
     "list_event",
     "find_free_time",
+    "suggest_slots",
+    "batch_events",
     "get_current_time"
-]
\ No newline at end of file
+]
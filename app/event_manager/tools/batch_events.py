@@ -0,0 +1,190 @@
+from pydantic import BaseModel
+from .event_store import get_event_store
+from ...telemetry import calendar_api_calls
+from .calendar_metadata import get_calendar_timezone
+from .datetimes import parse_user_datetime
+from .utils import get_calendar_service
+
+# Most calls the Calendar API accepts in one batch request
+MAX_BATCH_SIZE = 50
+
+class EventOperation(BaseModel):
+    """One change in a batch_events call."""
+
+    action: str
+    event_id: str = ""
+    summary: str = ""
+    start_time: str = ""
+    end_time: str = ""
+
+def batch_events(
+    operations: list[EventOperation],
+    confirm: bool,
+) -> dict:
+    """
+    Create, edit and delete several events in Google Calendar with a single request.
+
+    Args:
+        operations (list[EventOperation]): The changes to make, each with:
+            - "action": "create", "edit" or "delete"
+            - "event_id": ID of the event to edit or delete (not used for create)
+            - "summary": Event title (required for create, optional for edit)
+            - "start_time": Start time, e.g. "2023-12-31 14:00" (required for create, optional for edit)
+            - "end_time": End time, e.g. "2023-12-31 15:00" (required for create, optional for edit)
+        confirm (bool): Confirmation flag (must be set to True if any operation is a delete)
+
+    Returns:
+        dict: Overall status and a result for every operation, in the same order
+    """
+    if not operations:
+        return {
+            "status": "error",
+            "message": "No operations given",
+            "results": [],
+        }
+
+    try:
+        operations = [EventOperation.model_validate(op) for op in operations]
+    except ValueError as e:
+        return {
+            "status": "error",
+            "message": f"Invalid operations: {str(e)}",
+            "results": [],
+        }
+
+    if not confirm and any(op.action == "delete" for op in operations):
+        return {
+            "status": "error",
+            "message": "Please confirm deletion by setting confirm=True",
+            "results": [],
+        }
+
+    try:
+        # Get calendar service
+        service = get_calendar_service()
+        if not service:
+            return {
+                "status": "error",
+                "message": "Failed to authenticate with Google Calendar",
+                "results": [],
+            }
+
+        # Always use primary calendar
+        calendar_id = "primary"
+        store = get_event_store(calendar_id)
+
+        results = [None] * len(operations)
+        requests = []
+        timezone_id = None
+
+        # Validate every operation and build its API request
+        for index, op in enumerate(operations):
+            action = op.action
+            event_id = op.event_id
+            result = {"index": index, "action": action, "event_id": event_id}
+            results[index] = result
+
+            if action == "delete":
+                if not event_id:
+                    result.update(status="error", message="Missing event_id")
+                    continue
+                request = service.events().delete(calendarId=calendar_id, eventId=event_id)
+                requests.append((index, request))
+                continue
+
+            if action not in ("create", "edit"):
+                result.update(status="error", message=f"Unknown action: {action}")
+                continue
+            if action == "edit" and not event_id:
+                result.update(status="error", message="Missing event_id")
+                continue
+
+            summary, start_time, end_time = op.summary, op.start_time, op.end_time
+            if action == "create" and not (summary and start_time and end_time):
+                result.update(
+                    status="error",
+                    message="summary, start_time and end_time are required to create an event",
+                )
+                continue
+
+            start_dt = parse_user_datetime(start_time) if start_time else None
+            end_dt = parse_user_datetime(end_time) if end_time else None
+            if (start_time and not start_dt) or (end_time and not end_dt):
+                result.update(
+                    status="error",
+                    message="Invalid date/time format. Please use YYYY-MM-DD HH:MM format.",
+                )
+                continue
+
+            # Keep the timezone of an edited event, otherwise use the calendar's
+            event_timezone = None
+            cached = store.get(event_id) if event_id else None
+            if cached:
+                event_timezone = cached.get("start", {}).get("timeZone")
+            if not event_timezone and (start_dt or end_dt):
+                if timezone_id is None:
+                    timezone_id = get_calendar_timezone(service)
+                event_timezone = timezone_id
+
+            body = {}
+            if summary:
+                body["summary"] = summary
+            if start_dt:
+                body["start"] = {"dateTime": start_dt.isoformat(), "timeZone": event_timezone}
+            if end_dt:
+                body["end"] = {"dateTime": end_dt.isoformat(), "timeZone": event_timezone}
+            if not body:
+                result.update(status="error", message="Nothing to change")
+                continue
+
+            if action == "create":
+                request = service.events().insert(calendarId=calendar_id, body=body)
+            else:
+                # Patch merges into the old start and end, so the date of an
+                # all-day event is cleared explicitly
+                for field in ("start", "end"):
+                    if field in body:
+                        body[field]["date"] = None
+                # Only the changed fields are sent, conditional on the cached ETag
+                request = service.events().patch(
+                    calendarId=calendar_id, eventId=event_id, body=body
+                )
+                if cached and cached.get("etag"):
+                    request.headers["If-Match"] = cached["etag"]
+            requests.append((index, request))
+
+        def handle_response(request_id, response, exception):
+            result = results[int(request_id)]
+            if exception is not None:
+                result.update(status="error", message=str(exception))
+                return
+
+            result["status"] = "success"
+            if result["action"] == "delete":
+                store.remove(result["event_id"])
+            else:
+                store.put(response)
+                result["event_id"] = response["id"]
+                result["event_link"] = response.get("htmlLink", "")
+
+        # Send the requests in as few batch calls as the API allows
+        for chunk_start in range(0, len(requests), MAX_BATCH_SIZE):
+            batch = service.new_batch_http_request(callback=handle_response)
+            for index, request in requests[chunk_start:chunk_start + MAX_BATCH_SIZE]:
+                batch.add(request, request_id=str(index))
+            calendar_api_calls.inc(method="batch")
+            batch.execute()
+
+        succeeded = sum(1 for result in results if result.get("status") == "success")
+        return {
+            "status": "success" if succeeded == len(results) else "partial" if succeeded else "error",
+            "message": f"{succeeded} of {len(results)} operation(s) succeeded",
+            "results": results,
+        }
+
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"Error running batch operations: {str(e)}",
+            "results": [],
+        }
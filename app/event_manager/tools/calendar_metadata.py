@@ -0,0 +1,128 @@
+import os
+import threading
+import time
+from .shared_cache import shared_cache
+
+# Timezone used when the calendar settings cannot be read
+DEFAULT_TIMEZONE = "Asia/Kolkata"
+
+# How long calendar metadata is trusted before it is fetched again
+METADATA_TTL = float(os.getenv("SCHEDULEAI_METADATA_TTL", "3600"))
+
+# Calendar list properties the tools read, requested as a partial response
+CALENDAR_FIELDS = "items(id,summary,timeZone,primary,accessRole,defaultReminders)"
+
+
+class CalendarMetadata:
+    """
+    TTL cache of the user's calendar list, timezone and default reminders.
+
+    Everything comes from a single calendarList().list call, so one round trip
+    refreshes all of it. With a shared cache configured, a result another
+    worker fetched within the TTL is reused instead.
+    """
+
+    def __init__(self, ttl=METADATA_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._calendars = None
+        self._timezone = None
+        self._loaded_at = 0.0
+
+    def get_calendars(self, service):
+        """
+        Get the user's calendars, keyed by calendar ID.
+
+        Args:
+            service: A Google Calendar service object
+
+        Returns:
+            dict: Calendar list entries keyed by ID, with "primary" always present
+            if the user has a primary calendar
+        """
+        with self._lock:
+            if self._calendars is None or time.monotonic() - self._loaded_at >= self.ttl:
+                self._load(service)
+            return self._calendars
+
+    def get_timezone(self, service):
+        """Get the timezone of the user's primary calendar."""
+        self.get_calendars(service)
+        return self.cached_timezone()
+
+    def get_default_reminders(self, service, calendar_id="primary"):
+        """Get the default reminders of a calendar, or an empty list."""
+        calendar = self.get_calendars(service).get(calendar_id, {})
+        return calendar.get("defaultReminders", [])
+
+    def has_timezone(self):
+        """Whether the timezone was ever loaded, so cached_timezone() is not just the default."""
+        return self._timezone is not None
+
+    def cached_timezone(self):
+        """Get the timezone without making any API call, even if it is stale."""
+        return self._timezone or DEFAULT_TIMEZONE
+
+    def clear(self):
+        """Forget the cached metadata, so the next call fetches it again."""
+        with self._lock:
+            self._calendars = None
+            self._timezone = None
+            self._loaded_at = 0.0
+
+    def _load(self, service):
+        if shared_cache is not None:
+            cached = shared_cache.get("calendar_metadata", max_age=self.ttl)
+            if cached is not None:
+                self._calendars = cached["calendars"]
+                self._timezone = cached["timezone"] or self._timezone
+                self._loaded_at = time.monotonic()
+                return
+
+        try:
+            result = service.calendarList().list(fields=CALENDAR_FIELDS).execute()
+        except Exception:
+            # Keep serving what we had, and try again on the next call
+            if self._calendars is None:
+                self._calendars = {}
+            return
+
+        calendars = {}
+        timezone_id = None
+        for calendar in result.get("items", []):
+            calendars[calendar["id"]] = calendar
+            if calendar.get("primary"):
+                calendars["primary"] = calendar
+                timezone_id = calendar.get("timeZone")
+
+        if not timezone_id:
+            try:
+                setting = service.settings().get(setting="timezone").execute()
+                timezone_id = setting.get("value")
+            except Exception:
+                pass
+
+        self._calendars = calendars
+        self._timezone = timezone_id or self._timezone
+        self._loaded_at = time.monotonic()
+        if shared_cache is not None:
+            shared_cache.put(
+                "calendar_metadata", {"calendars": calendars, "timezone": timezone_id}
+            )
+
+
+calendar_metadata = CalendarMetadata()
+
+
+def get_calendar_timezone(service):
+    """
+    Get the calendar timezone from the metadata cache.
+
+    Args:
+        service: A Google Calendar service object
+
+    Returns:
+        str: The calendar timezone, or DEFAULT_TIMEZONE if it cannot be read
+    """
+    return calendar_metadata.get_timezone(service)
+
@@ -1,5 +1,8 @@
 import datetime
-from .utils import get_calendar_service, parse_datetime
+from .event_store import get_event_store
+from .calendar_metadata import get_calendar_timezone
+from .datetimes import parse_user_datetime
+from .utils import get_calendar_service
 
 def create_event(
     summary: str,
@@ -30,8 +33,8 @@ def create_event(
         calendar_id = "primary"
 
         # Parse time
-        start_dt = parse_datetime(start_time)
-        end_dt = parse_datetime(end_time)
+        start_dt = parse_user_datetime(start_time)
+        end_dt = parse_user_datetime(end_time)
 
         if not start_dt or not end_dt:
             return {
@@ -39,18 +42,8 @@ def create_event(
                 "message": "Invalid date/time format. Please use YYYY-MM-DD HH:MM format.",
             }
 
-        # Default timezone
-        timezone_id = "Asia/Kolkata"
-
-        try:
-            # Get the timezone from the calendar settings
-            settings = service.settings().list().execute()
-            for setting in settings.get("items", []):
-                if setting.get("id") == "timezone":
-                    timezone_id = setting.get("value")
-                    break
-        except Exception:
-            pass
+        # Get the timezone from the calendar settings
+        timezone_id = get_calendar_timezone(service)
 
         # Create event body without type annotations
         event_body = {}
@@ -69,6 +62,7 @@ def create_event(
         event = (
             service.events().insert(calendarId=calendar_id, body=event_body).execute()
         )
+        get_event_store(calendar_id).put(event)
 
         return {
             "status": "success",
@@ -0,0 +1,130 @@
+from datetime import date, datetime, time, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+# Formats accepted for times given by the user, keyed by the shape of the string:
+# (month/day/year with slashes, month name first, 12-hour clock, has a time)
+INPUT_FORMATS = {
+    (False, False, False, True): "%Y-%m-%d %H:%M",
+    (False, False, True, True): "%Y-%m-%d %I:%M %p",
+    (False, False, False, False): "%Y-%m-%d",
+    (True, False, False, True): "%m/%d/%Y %H:%M",
+    (True, False, True, True): "%m/%d/%Y %I:%M %p",
+    (True, False, False, False): "%m/%d/%Y",
+    (False, True, False, True): "%B %d, %Y %H:%M",
+    (False, True, True, True): "%B %d, %Y %I:%M %p",
+    (False, True, False, False): "%B %d, %Y",
+}
+
+
+@lru_cache(maxsize=None)
+def get_zone(timezone_id):
+    """
+    Get the tzinfo for a timezone ID, building each ZoneInfo only once.
+
+    Args:
+        timezone_id (str): An IANA timezone ID such as "Asia/Kolkata"
+
+    Returns:
+        tzinfo: The zone, or UTC if the ID is empty or unknown
+    """
+    if not timezone_id:
+        return timezone.utc
+    try:
+        return ZoneInfo(timezone_id)
+    except (ZoneInfoNotFoundError, ValueError):
+        return timezone.utc
+
+
+def utc_now():
+    """Get the current time as naive UTC, the form the event store works in."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def now(timezone_id):
+    """Get the current time as an aware datetime in a timezone."""
+    return datetime.now(get_zone(timezone_id))
+
+
+def to_naive_utc(dt):
+    """Convert an aware datetime to naive UTC, leaving naive datetimes unchanged."""
+    if dt.tzinfo is not None:
+        return dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def local_to_utc(local, timezone_id):
+    """Convert a naive wall-clock time in a timezone to naive UTC."""
+    return to_naive_utc(local.replace(tzinfo=get_zone(timezone_id)))
+
+
+def utc_to_local(utc, timezone_id):
+    """Convert a naive UTC time to an aware datetime in a timezone."""
+    return utc.replace(tzinfo=timezone.utc).astimezone(get_zone(timezone_id))
+
+
+def parse_api_time(event_time, timezone_id=None):
+    """
+    Parse an event start/end dictionary from the Google Calendar API.
+
+    The API always sends RFC 3339 timestamps, which fromisoformat reads
+    directly, "Z" included, so there is no format guessing on this path.
+
+    Args:
+        event_time (dict): A dictionary with "dateTime" or, for all-day events, "date"
+        timezone_id (str): Zone whose midnight starts an all-day event, UTC if None
+
+    Returns:
+        datetime: An aware datetime, or None if the dictionary has no usable time
+    """
+    try:
+        value = event_time.get("dateTime")
+        if value is not None:
+            dt = datetime.fromisoformat(value)
+            return dt if dt.tzinfo is not None else dt.replace(tzinfo=timezone.utc)
+        value = event_time.get("date")
+        if value is not None:
+            return datetime.combine(date.fromisoformat(value), time(), get_zone(timezone_id))
+    except ValueError:
+        pass
+    return None
+
+
+def parse_user_datetime(value):
+    """
+    Parse a date and time given by the user or the agent.
+
+    ISO 8601 strings are read by fromisoformat. Anything else is matched to
+    one of INPUT_FORMATS by its shape, so at most one strptime call is made
+    instead of trying every format in turn.
+
+    Args:
+        value (str): E.g. "2025-07-01 15:00", "07/01/2025 3:00 PM" or "July 1, 2025"
+
+    Returns:
+        datetime: The parsed datetime, naive unless the string had an offset,
+        or None if it matches no accepted format
+    """
+    value = value.strip()
+    if not value:
+        return None
+    if value[4:5] == "-":
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            pass
+
+    upper = value.upper()
+    shape = (
+        "/" in value,
+        value[0].isalpha(),
+        upper.endswith("AM") or upper.endswith("PM"),
+        ":" in value,
+    )
+    fmt = INPUT_FORMATS.get(shape)
+    if fmt is None:
+        return None
+    try:
+        return datetime.strptime(value, fmt)
+    except ValueError:
+        return None
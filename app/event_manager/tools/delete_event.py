@@ -1,3 +1,4 @@
+from .event_store import get_event_store
 from .utils import get_calendar_service
 
 def delete_event(
@@ -34,6 +35,7 @@ def delete_event(
 
         # Call the Calendar API to delete the event
         service.events().delete(calendarId=calendar_id, eventId=event_id).execute()
+        get_event_store(calendar_id).remove(event_id)
 
         return {
             "status": "success",
@@ -1,4 +1,72 @@
-from .utils import get_calendar_service, parse_datetime
+from googleapiclient.errors import HttpError
+from .event_store import get_event_store
+from .calendar_metadata import get_calendar_timezone
+from .datetimes import parse_api_time, parse_user_datetime
+from .utils import format_event_time, get_calendar_service
+
+# What a patch needs to know about an event the store does not hold
+PATCH_FIELDS = "etag,summary,start,end"
+
+
+def _conflicting_fields(known, current, summary, start_dt, end_dt):
+    """
+    Get the fields about to be patched that someone else changed since known was read.
+
+    Args:
+        known (dict): The event as it was when the edit was decided on
+        current (dict): The event as it is now
+        summary (str): New summary, or empty string if it is not patched
+        start_dt (datetime): New start time, or None if it is not patched
+        end_dt (datetime): New end time, or None if it is not patched
+
+    Returns:
+        list: Names of the conflicting fields, empty if the patch can be retried safely
+    """
+    conflicts = []
+    if summary and known.get("summary") != current.get("summary"):
+        conflicts.append("summary")
+    for field, new_value in (("start", start_dt), ("end", end_dt)):
+        if new_value and parse_api_time(known.get(field, {})) != parse_api_time(current.get(field, {})):
+            conflicts.append(field)
+    return conflicts
+
+def _patch_event(service, calendar_id, event_id, event, summary, start_dt, end_dt):
+    """
+    Send only the changed fields, conditional on the ETag of the known event.
+
+    Args:
+        service: A Google Calendar service object
+        calendar_id (str): The calendar the event is in
+        event_id (str): The ID of the event to patch
+        event (dict): The last known event resource, with at least its etag and times
+        summary (str): New summary, or empty string to keep it
+        start_dt (datetime): New start time, or None to keep it
+        end_dt (datetime): New end time, or None to keep it
+
+    Returns:
+        dict: The updated event resource
+    """
+    body = {}
+    if summary:
+        body["summary"] = summary
+
+    if start_dt or end_dt:
+        # Keep the timezone of the original event. Patch merges into the old
+        # start and end, so the date of an all-day event is cleared explicitly
+        timezone_id = event.get("start", {}).get("timeZone")
+        if not timezone_id:
+            timezone_id = get_calendar_timezone(service)
+        if start_dt:
+            body["start"] = {"date": None, "dateTime": start_dt.isoformat(), "timeZone": timezone_id}
+        if end_dt:
+            body["end"] = {"date": None, "dateTime": end_dt.isoformat(), "timeZone": timezone_id}
+
+    request = service.events().patch(
+        calendarId=calendar_id, eventId=event_id, body=body
+    )
+    if event.get("etag"):
+        request.headers["If-Match"] = event["etag"]
+    return request.execute()
 
 def edit_event(
     event_id: str,
@@ -16,7 +84,9 @@ def edit_event(
         end_time (str): New end time (e.g., "2023-12-31 15:00", pass empty string to keep unchanged)
 
     Returns:
-        dict: Information about the edited event or error details
+        dict: Information about the edited event or error details. If someone
+        else changed a field being edited in the meantime, nothing is updated and
+        the error has "conflict" set and the event's "current_event" details
     """
     try:
         # Get calendar service
@@ -29,51 +99,83 @@ def edit_event(
 
         # Always use primary calendar
         calendar_id = "primary"
+        store = get_event_store(calendar_id)
 
-        # Get the existing event
-        try:
-            event = (
-                service.events().get(calendarId=calendar_id, eventId=event_id).execute()
-            )
-        except Exception:
-            return {
-                "status": "error",
-                "message": f"Event with ID {event_id} not found in primary calendar.",
-            }
-
-        # Update the event with new values
-        if summary:
-            event["summary"] = summary
-
-        # Get timezone from the original event
-        timezone_id = "Asia/Kolkata"
-        if "start" in event and "timeZone" in event["start"]:
-            timezone_id = event["start"]["timeZone"]
-
+        start_dt = None
         if start_time:
-            start_dt = parse_datetime(start_time)
+            start_dt = parse_user_datetime(start_time)
             if not start_dt:
                 return {
                     "status": "error",
                     "message": "Invalid start time format. Please use YYYY-MM-DD HH:MM format.",
                 }
-            event["start"] = {"dateTime": start_dt.isoformat(), "timeZone": timezone_id}
 
+        end_dt = None
         if end_time:
-            end_dt = parse_datetime(end_time)
+            end_dt = parse_user_datetime(end_time)
             if not end_dt:
                 return {
                     "status": "error",
                     "message": "Invalid end time format. Please use YYYY-MM-DD HH:MM format.",
                 }
-            event["end"] = {"dateTime": end_dt.isoformat(), "timeZone": timezone_id}
-
-        # Update the event
-        updated_event = (
-            service.events()
-            .update(calendarId=calendar_id, eventId=event_id, body=event)
-            .execute()
-        )
+
+        if not (summary or start_dt or end_dt):
+            return {
+                "status": "error",
+                "message": "Nothing to change. Give a new summary, start_time or end_time.",
+            }
+
+        try:
+            # Use the cached copy for the ETag and timezone; an event the store does
+            # not hold is read first, with only the fields the patch needs, so the
+            # patch is still conditional
+            event = store.get(event_id) or (
+                service.events()
+                .get(calendarId=calendar_id, eventId=event_id, fields=PATCH_FIELDS)
+                .execute()
+            )
+            try:
+                updated_event = _patch_event(
+                    service, calendar_id, event_id, event, summary, start_dt, end_dt
+                )
+            except HttpError as e:
+                if e.resp.status != 412:
+                    raise
+
+                # Someone else changed the event since we saw it. Retry only if
+                # they left the fields we patch alone, otherwise their edit would
+                # be overwritten
+                current = (
+                    service.events().get(calendarId=calendar_id, eventId=event_id).execute()
+                )
+                store.put(current)
+                conflicts = _conflicting_fields(event, current, summary, start_dt, end_dt)
+                if conflicts:
+                    return {
+                        "status": "error",
+                        "conflict": True,
+                        "message": (
+                            f"Event {event_id} was changed by someone else "
+                            f"({', '.join(conflicts)}) and was not updated."
+                        ),
+                        "current_event": {
+                            "summary": current.get("summary", "Untitled Event"),
+                            "start": format_event_time(current.get("start", {})),
+                            "end": format_event_time(current.get("end", {})),
+                        },
+                    }
+                updated_event = _patch_event(
+                    service, calendar_id, event_id, current, summary, start_dt, end_dt
+                )
+        except HttpError as e:
+            if e.resp.status in (404, 410):
+                return {
+                    "status": "error",
+                    "message": f"Event with ID {event_id} not found in primary calendar.",
+                }
+            raise
+
+        store.put(updated_event)
 
         return {
             "status": "success",
@@ -0,0 +1,114 @@
+import os
+from .utils import format_event_time
+
+# How much of an event's description the full view shows
+DESCRIPTION_LIMIT = int(os.getenv("SCHEDULEAI_DESCRIPTION_LIMIT", "500"))
+
+# Characters of description shared by all events in one response, so long lists get shorter descriptions
+DESCRIPTION_BUDGET = int(os.getenv("SCHEDULEAI_DESCRIPTION_BUDGET", "8000"))
+
+# Shortest description cut the budget can force
+MIN_DESCRIPTION_LIMIT = 80
+
+# Fields each view returns, from smallest to largest
+VIEWS = {
+    "ids": ("id", "start", "end"),
+    "summary": ("id", "summary", "start", "end", "location"),
+    "full": ("id", "summary", "start", "end", "location", "description", "attendees", "link"),
+}
+
+
+class CalendarEvent:
+    """
+    The parts of an API event resource the tools return, without the rest.
+
+    Built from the stored event only when a response needs it, and turned into
+    a dictionary with just the fields of the requested view.
+    """
+
+    __slots__ = (
+        "id",
+        "calendar_id",
+        "summary",
+        "start",
+        "end",
+        "location",
+        "description",
+        "attendees",
+        "link",
+    )
+
+    def __init__(self, id, calendar_id, summary, start, end, location="",
+                 description="", attendees=(), link=""):
+        self.id = id
+        self.calendar_id = calendar_id
+        self.summary = summary
+        self.start = start
+        self.end = end
+        self.location = location
+        self.description = description
+        self.attendees = attendees
+        self.link = link
+
+    @classmethod
+    def from_api(cls, event, calendar_id=None, view="full"):
+        """
+        Build the event from an API event resource.
+
+        Args:
+            event (dict): An event resource from the Google Calendar API
+            calendar_id (str): The calendar it came from
+            view (str): The view it will be shown in; fields outside it are not read
+
+        Returns:
+            CalendarEvent: The compact event
+        """
+        compact = cls(
+            event.get("id"),
+            calendar_id,
+            event.get("summary", "Untitled Event"),
+            format_event_time(event.get("start", {})),
+            format_event_time(event.get("end", {})),
+        )
+        if view != "ids":
+            compact.location = event.get("location", "")
+        if view == "full":
+            compact.description = event.get("description", "")
+            compact.attendees = tuple(
+                attendee["email"] for attendee in event.get("attendees", []) if "email" in attendee
+            )
+            compact.link = event.get("htmlLink", "")
+        return compact
+
+    def to_dict(self, view="summary", description_limit=DESCRIPTION_LIMIT, with_calendar=False):
+        """
+        Get the fields of a view as a dictionary for a tool response.
+
+        Args:
+            view (str): "ids", "summary" or "full"
+            description_limit (int): Characters of description to keep in the full view
+            with_calendar (bool): Add the calendar ID, when several calendars are listed
+
+        Returns:
+            dict: The event's fields; empty locations are left out of the summary view
+        """
+        result = {}
+        for field in VIEWS[view]:
+            value = getattr(self, field)
+            if field == "location" and view == "summary" and not value:
+                continue
+            if field == "description" and len(value) > description_limit:
+                value = value[:description_limit].rstrip() + " …"
+            elif field == "attendees":
+                value = list(value)
+            result[field] = value
+        if with_calendar:
+            result["calendar_id"] = self.calendar_id
+        return result
+
+
+def description_limit_for(count):
+    """Get the description cut for a response with count events, within DESCRIPTION_BUDGET."""
+    if not count:
+        return DESCRIPTION_LIMIT
+    return max(MIN_DESCRIPTION_LIMIT, min(DESCRIPTION_LIMIT, DESCRIPTION_BUDGET // count))
@@ -0,0 +1,498 @@
+import bisect
+import heapq
+import itertools
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from googleapiclient.errors import HttpError
+from ...telemetry import event_store_reads, get_logger
+from .calendar_metadata import get_calendar_timezone
+from .datetimes import parse_api_time, to_naive_utc, utc_now
+from .executor import get_tool_executor
+from .shared_cache import shared_cache
+from .utils import get_calendar_service, iter_event_pages, iter_events
+
+logger = get_logger(__name__)
+
+# How long a store trusts its data before pulling deltas from the API
+SYNC_INTERVAL = float(os.getenv("SCHEDULEAI_SYNC_INTERVAL", "30"))
+
+# How old data may get and still be served while a background sync refreshes it;
+# older data is synced before the query returns
+STALE_WINDOW = float(os.getenv("SCHEDULEAI_STALE_WINDOW", "300"))
+
+# How far before today the initial sync reaches
+SYNC_LOOKBACK = timedelta(days=30)
+
+# Minimum seconds between snapshots of a changed store written to the shared cache
+SNAPSHOT_INTERVAL = float(os.getenv("SCHEDULEAI_SNAPSHOT_INTERVAL", "300"))
+
+
+def event_bounds(event, timezone_id=None):
+    """
+    Get the start and end of an API event as naive UTC datetimes.
+
+    Args:
+        event (dict): An event resource from the Google Calendar API
+        timezone_id (str): Calendar timezone, whose midnight starts all-day events
+
+    Returns:
+        tuple: (start, end) datetimes or None if the event has no usable times
+    """
+    start = parse_api_time(event.get("start", {}), timezone_id)
+    end = parse_api_time(event.get("end", {}), timezone_id)
+    if start is None or end is None:
+        return None
+    return to_naive_utc(start), to_naive_utc(end)
+
+
+def _start_key(item):
+    return item[1][0]
+
+
+def merge_by_start(entries_by_calendar, limit=None):
+    """
+    Merge per-calendar entry lists, each ordered by start time, into one.
+
+    A k-way merge keyed on the bounds the entries already carry: the lists are
+    in order, so nothing is sorted or parsed again, and only the first limit
+    entries are ever produced. A single calendar is passed through as it is.
+
+    Args:
+        entries_by_calendar (dict): (start, end, event) lists keyed by calendar ID,
+            as EventStore.query returns them
+        limit (int): Maximum number of entries to return, or None for all
+
+    Returns:
+        list: (calendar_id, (start, end, event)) pairs ordered by start time
+    """
+    streams = [
+        zip(itertools.repeat(calendar_id), entries)
+        for calendar_id, entries in entries_by_calendar.items()
+    ]
+    if len(streams) == 1:
+        return list(itertools.islice(streams[0], limit))
+    return list(itertools.islice(heapq.merge(*streams, key=_start_key), limit))
+
+
+def _build_index(events, timezone_id):
+    """
+    Index events by start time.
+
+    Args:
+        events (dict): Event resources keyed by ID
+        timezone_id (str): Calendar timezone, whose midnight starts all-day events
+
+    Returns:
+        tuple: (entries keyed by ID, sorted (start, ID) index, longest duration);
+        events without usable times are left out
+    """
+    entries = {}
+    max_duration = timedelta(0)
+    for event_id, event in events.items():
+        bounds = event_bounds(event, timezone_id)
+        if bounds:
+            entries[event_id] = (*bounds, event)
+            max_duration = max(max_duration, bounds[1] - bounds[0])
+    # One sort instead of an insort per event
+    index = sorted((entry[0], event_id) for event_id, entry in entries.items())
+    return entries, index, max_duration
+
+
+class EventStore:
+    """
+    In-memory copy of one calendar, kept current with Calendar sync tokens.
+
+    The first query does a full events().list from shortly before the requested
+    range; later queries only pull the changes since the last sync, and only once
+    the data is older than SYNC_INTERVAL. Events are indexed by start time so
+    range queries never touch the API. Each event is parsed once into a
+    (start, end, event) entry, which queries hand out without copying.
+
+    Data between SYNC_INTERVAL and STALE_WINDOW old is served as it is while
+    the changes are pulled in the background (stale-while-revalidate), so a
+    query only waits on the API when the store is empty or older than that.
+
+    With a shared cache configured, the store is snapshotted there with its
+    sync token, and a new worker starts from the snapshot and pulls only the
+    changes since, instead of doing its own full sync.
+    """
+
+    def __init__(self, calendar_id):
+        self.calendar_id = calendar_id
+        self._lock = threading.RLock()
+        self._events = {}
+        self._entries = {}
+        self._index = []
+        self._max_duration = timedelta(0)
+        self._sync_token = None
+        self._synced_from = None
+        self._last_sync = 0.0
+        self._changed = False
+        self._snapshot_at = 0.0
+        self._snapshot = None
+        self._snapshot_lock = threading.Lock()
+        self._revalidating = False
+        # IDs written by the tools while a background sync runs, None when none runs
+        self._written = None
+        self._timezone_id = None
+
+    def query(self, service, time_min, time_max, limit=None):
+        """
+        Get the events overlapping a time range, ordered by start time.
+
+        Ranges that start before the synced part of the calendar are streamed
+        straight from the API instead, so one look into the past does not
+        re-sync the whole store.
+
+        Args:
+            service: A Google Calendar service object
+            time_min (datetime): Start of the range as naive UTC
+            time_max (datetime): End of the range as naive UTC
+            limit (int): Maximum number of events to return, or None for all
+
+        Returns:
+            list: (start, end, event) entries overlapping the range, with the
+            bounds as naive UTC so callers need not parse the events again
+        """
+        # Resolved before taking the lock, it may need an API call
+        timezone_id = get_calendar_timezone(service)
+        try:
+            with self._lock:
+                self._set_timezone(timezone_id)
+                if self._sync_token is None:
+                    lookback = utc_now().replace(
+                        hour=0, minute=0, second=0, microsecond=0
+                    ) - SYNC_LOOKBACK
+                    self._full_sync(service, min(time_min, lookback))
+                elif time_min < self._synced_from:
+                    entries = []
+                    for event in iter_events(
+                        service,
+                        self.calendar_id,
+                        limit,
+                        timeMin=time_min.isoformat() + "Z",
+                        timeMax=time_max.isoformat() + "Z",
+                        singleEvents=True,
+                        orderBy="startTime",
+                    ):
+                        bounds = event_bounds(event, timezone_id)
+                        if bounds:
+                            entries.append((*bounds, event))
+                    return entries
+                else:
+                    age = time.monotonic() - self._last_sync
+                    if age >= STALE_WINDOW:
+                        self._incremental_sync(service)
+                        event_store_reads.inc(freshness="synced")
+                    elif age >= SYNC_INTERVAL:
+                        self._start_revalidation()
+                        event_store_reads.inc(freshness="stale")
+                    else:
+                        event_store_reads.inc(freshness="fresh")
+                return self._range(time_min, time_max, limit)
+        finally:
+            # Written once the lock is released, so other queries do not wait on it
+            self._write_snapshot()
+
+    def covers(self, time_min):
+        """Whether a query from time_min can be answered from already synced data."""
+        with self._lock:
+            return self._sync_token is not None and time_min >= self._synced_from
+
+    def put(self, event):
+        """Insert or replace an event after a successful write."""
+        with self._lock:
+            self._remove(event.get("id"))
+            if event.get("status") != "cancelled":
+                self._add(event)
+            self._changed = True
+            if self._written is not None:
+                self._written.add(event.get("id"))
+
+    def remove(self, event_id):
+        """Drop an event after a successful delete."""
+        with self._lock:
+            self._remove(event_id)
+            instances = self._remove_instances(event_id)
+            self._changed = True
+            if self._written is not None:
+                self._written.add(event_id)
+                self._written.update(instances)
+
+    def get(self, event_id):
+        """Get a cached event by ID, or None if it is not in the store."""
+        with self._lock:
+            return self._events.get(event_id)
+
+    def _full_sync(self, service, time_min, use_snapshot=True):
+        if use_snapshot and self._restore_snapshot(time_min):
+            self._incremental_sync(service)
+            return
+
+        self._clear()
+        self._sync_token = self._fetch(service, timeMin=time_min.isoformat() + "Z")
+        self._synced_from = time_min
+        self._last_sync = time.monotonic()
+        self._save_snapshot()
+
+    def _incremental_sync(self, service):
+        try:
+            self._sync_token = self._fetch(service, syncToken=self._sync_token)
+            self._last_sync = time.monotonic()
+        except HttpError as e:
+            # The sync token expired, start over
+            if e.resp.status != 410:
+                raise
+            self._full_sync(service, self._synced_from, use_snapshot=False)
+            return
+        self._save_snapshot_if_due()
+
+    def _start_revalidation(self):
+        if self._revalidating:
+            return
+        self._revalidating = True
+        get_tool_executor().submit(self._revalidate)
+
+    def _revalidate(self):
+        """Pull the changes since the last sync without holding the lock during the calls."""
+        try:
+            with self._lock:
+                sync_token = self._sync_token
+                synced_from = self._synced_from
+                timezone_id = self._timezone_id
+                self._written = set()
+            # Services are per thread, so get this thread's own
+            service = get_calendar_service()
+            if not service or sync_token is None:
+                return
+            try:
+                items = []
+                for page in iter_event_pages(
+                    service, self.calendar_id, singleEvents=True, syncToken=sync_token
+                ):
+                    items.extend(page.get("items", []))
+            except HttpError as e:
+                if e.resp.status != 410:
+                    raise
+                self._relist(service, sync_token, synced_from, timezone_id)
+                return
+
+            with self._lock:
+                # A sync in the foreground, or a reset, got there first
+                if self._sync_token != sync_token:
+                    return
+                # The changes may predate writes the tools made meanwhile, whose
+                # copies are newer. Those events are skipped, and the sync token
+                # kept, so the next sync brings their current version
+                overtaken = [item for item in items if item["id"] in self._written]
+                self._apply([item for item in items if item["id"] not in self._written])
+                if not overtaken:
+                    self._sync_token = page.get("nextSyncToken")
+                self._last_sync = time.monotonic()
+                self._save_snapshot_if_due()
+            self._write_snapshot()
+        except Exception:
+            logger.warning(
+                "background sync failed", extra={"calendar_id": self.calendar_id}, exc_info=True
+            )
+        finally:
+            with self._lock:
+                self._written = None
+            self._revalidating = False
+
+    def _relist(self, service, sync_token, synced_from, timezone_id):
+        """
+        Replace the store with a fresh full listing after its sync token expired.
+
+        The listing and the new index are built without the lock, so queries keep
+        being served from the old data, and are swapped in at the end.
+        """
+        events = {}
+        for page in iter_event_pages(
+            service, self.calendar_id, singleEvents=True, timeMin=synced_from.isoformat() + "Z"
+        ):
+            for event in page.get("items", []):
+                if event.get("status") == "cancelled":
+                    events.pop(event["id"], None)
+                else:
+                    events[event["id"]] = event
+        entries, index, max_duration = _build_index(events, timezone_id)
+
+        with self._lock:
+            # A sync in the foreground, or a reset, got there first
+            if self._sync_token != sync_token:
+                return
+            # Writes the tools made meanwhile are newer than the listing, keep them
+            written = {event_id: self._events.get(event_id) for event_id in self._written}
+            self._events = {event_id: entry[2] for event_id, entry in entries.items()}
+            self._entries, self._index, self._max_duration = entries, index, max_duration
+            if timezone_id != self._timezone_id:
+                self._reindex()
+            for event_id, event in written.items():
+                self._remove(event_id)
+                if event:
+                    self._add(event)
+                else:
+                    self._remove_instances(event_id)
+            self._sync_token = page.get("nextSyncToken")
+            self._last_sync = time.monotonic()
+            self._save_snapshot()
+        self._write_snapshot()
+
+    def _set_timezone(self, timezone_id):
+        """Place all-day events at midnight in timezone_id, re-indexing them if it changed."""
+        if timezone_id == self._timezone_id:
+            return
+        self._timezone_id = timezone_id
+        self._reindex()
+
+    def _reindex(self):
+        self._entries, self._index, self._max_duration = _build_index(
+            self._events, self._timezone_id
+        )
+        # Events without usable times are not kept
+        if len(self._entries) != len(self._events):
+            self._events = {event_id: entry[2] for event_id, entry in self._entries.items()}
+
+    def _clear(self):
+        self._events.clear()
+        self._entries.clear()
+        self._index.clear()
+        self._max_duration = timedelta(0)
+
+    def _restore_snapshot(self, time_min):
+        """Load the shared snapshot if it covers time_min; returns whether it did."""
+        if shared_cache is None:
+            return False
+        snapshot = shared_cache.get(f"events:{self.calendar_id}")
+        if not snapshot or not snapshot.get("sync_token"):
+            return False
+        synced_from = datetime.fromisoformat(snapshot["synced_from"])
+        if synced_from > time_min:
+            return False
+
+        self._clear()
+        self._events.update((event["id"], event) for event in snapshot["events"])
+        self._reindex()
+        self._sync_token = snapshot["sync_token"]
+        self._synced_from = synced_from
+        self._snapshot_at = time.monotonic()
+        return True
+
+    def _save_snapshot_if_due(self):
+        if self._changed and time.monotonic() - self._snapshot_at >= SNAPSHOT_INTERVAL:
+            self._save_snapshot()
+
+    def _save_snapshot(self):
+        """Take a snapshot under the lock; _write_snapshot writes it once the lock is released."""
+        self._changed = False
+        self._snapshot_at = time.monotonic()
+        if shared_cache is None or not self._sync_token:
+            return
+        # Only the list of events is copied here, serializing it is left to the writer
+        self._snapshot = {
+            "events": list(self._events.values()),
+            "sync_token": self._sync_token,
+            "synced_from": self._synced_from.isoformat(),
+        }
+
+    def _write_snapshot(self):
+        """Write the pending snapshot to the shared cache; call without holding the lock."""
+        if self._snapshot is None:
+            return
+        # Writers go one at a time, so an older snapshot never replaces a newer one
+        with self._snapshot_lock:
+            with self._lock:
+                snapshot, self._snapshot = self._snapshot, None
+            if snapshot is not None:
+                shared_cache.put(f"events:{self.calendar_id}", snapshot)
+
+    def _fetch(self, service, **params):
+        """Apply every page of an events().list call and return the next sync token."""
+        for page in iter_event_pages(
+            service, self.calendar_id, singleEvents=True, **params
+        ):
+            self._apply(page.get("items", []))
+        return page.get("nextSyncToken")
+
+    def _apply(self, items):
+        """Apply changed and cancelled events from an events().list result."""
+        if items:
+            self._changed = True
+        for event in items:
+            self._remove(event["id"])
+            if event.get("status") == "cancelled":
+                self._remove_instances(event["id"])
+            else:
+                self._add(event)
+
+    def _add(self, event):
+        bounds = event_bounds(event, self._timezone_id)
+        if not bounds:
+            return
+        event_id = event["id"]
+        self._events[event_id] = event
+        self._entries[event_id] = (*bounds, event)
+        bisect.insort(self._index, (bounds[0], event_id))
+        self._max_duration = max(self._max_duration, bounds[1] - bounds[0])
+
+    def _remove(self, event_id):
+        entry = self._entries.pop(event_id, None)
+        if not entry:
+            return
+        del self._events[event_id]
+        position = bisect.bisect_left(self._index, (entry[0], event_id))
+        del self._index[position]
+
+    def _remove_instances(self, recurring_event_id):
+        """Drop the expanded instances of a cancelled recurring event and return their IDs."""
+        instances = [
+            event_id
+            for event_id, event in self._events.items()
+            if event.get("recurringEventId") == recurring_event_id
+        ]
+        for event_id in instances:
+            self._remove(event_id)
+        return instances
+
+    def _range(self, time_min, time_max, limit=None):
+        # Events that start before time_min can still overlap it, so look back
+        # by the longest event in the store
+        position = bisect.bisect_left(self._index, (time_min - self._max_duration,))
+        entries = []
+        for start, event_id in itertools.islice(self._index, position, None):
+            if start >= time_max or len(entries) == limit:
+                break
+            entry = self._entries[event_id]
+            if entry[1] > time_min:
+                entries.append(entry)
+        return entries
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_event_store(calendar_id="primary"):
+    """
+    Get the shared event store for a calendar.
+
+    Args:
+        calendar_id (str): The calendar to get the store for
+
+    Returns:
+        EventStore: The store for that calendar
+    """
+    with _stores_lock:
+        store = _stores.get(calendar_id)
+        if store is None:
+            store = _stores[calendar_id] = EventStore(calendar_id)
+        return store
+
+
+def reset_event_stores():
+    """Drop every event store, so the next query starts with a full sync."""
+    with _stores_lock:
+        _stores.clear()
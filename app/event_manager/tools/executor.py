@@ -0,0 +1,96 @@
+import asyncio
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from ...telemetry import tool_latency
+
+# Maximum number of blocking Calendar tool calls running at the same time
+MAX_CONCURRENT_TOOLS = int(os.getenv("SCHEDULEAI_TOOL_CONCURRENCY", "8"))
+
+# Maximum number of calendars fetched at the same time, across all tool calls
+MAX_CALENDAR_FANOUT = int(os.getenv("SCHEDULEAI_CALENDAR_FANOUT", "4"))
+
+_executor = None
+_fanout_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_tool_executor():
+    """
+    Get the bounded thread pool that blocking Calendar tools run on.
+
+    Returns:
+        ThreadPoolExecutor: The shared tool executor
+    """
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=MAX_CONCURRENT_TOOLS,
+                    thread_name_prefix="calendar-tool",
+                )
+    return _executor
+
+
+def fan_out(func, items):
+    """
+    Call a blocking function for every item concurrently and collect the results.
+
+    Runs on a pool separate from the tool executor: the tools calling this
+    already hold a tool executor thread, and waiting on their own pool could
+    leave every thread waiting. A single item runs on the calling thread.
+
+    Args:
+        func (callable): Called with each item
+        items (list): The items, e.g. calendar IDs
+
+    Returns:
+        list: The results, in the order of items
+    """
+    global _fanout_executor
+
+    if len(items) <= 1:
+        return [func(item) for item in items]
+
+    if _fanout_executor is None:
+        with _executor_lock:
+            if _fanout_executor is None:
+                _fanout_executor = ThreadPoolExecutor(
+                    max_workers=MAX_CALENDAR_FANOUT,
+                    thread_name_prefix="calendar-fanout",
+                )
+    return list(_fanout_executor.map(func, items))
+
+
+def run_in_executor(func):
+    """
+    Wrap a blocking tool function into an async tool that runs on the tool executor.
+
+    The wrapper keeps the name, docstring and signature of the original function,
+    so the agent sees the same tool declaration. Calls beyond the concurrency
+    limit wait in the executor queue instead of blocking the event loop. The
+    latency of every call, including that wait, is recorded per tool.
+
+    Args:
+        func (callable): The blocking tool function
+
+    Returns:
+        callable: An async version of the tool
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            return await loop.run_in_executor(
+                get_tool_executor(), functools.partial(func, *args, **kwargs)
+            )
+        finally:
+            tool_latency.observe(time.perf_counter() - start, tool=func.__name__)
+
+    return wrapper
@@ -1,39 +1,241 @@
 import datetime
-from .utils import get_calendar_service
+from typing import Optional
+from ...telemetry import get_logger
+from .calendar_metadata import get_calendar_timezone
+from .datetimes import local_to_utc, now, parse_api_time, to_naive_utc, utc_to_local
+from .event_store import get_event_store, merge_by_start
+from .executor import fan_out
+from .utils import get_calendar_service, resolve_calendar_ids
+
+logger = get_logger(__name__)
+
+# Only the busy periods are needed from a freebusy query
+FREEBUSY_FIELDS = "calendars(busy,errors)"
 
 def format_time_for_display(dt):
     """
     Format datetime for display in AM/PM format, following existing tools pattern.
     """
-    if dt.tzinfo:
-        return dt.strftime("%I:%M %p")
+    return dt.strftime("%I:%M %p")
+
+def fetch_busy_periods(service, calendar_ids, time_min, time_max):
+    """
+    Get busy periods with freebusy().query, which returns no event details.
+
+    The response is a few bytes per busy block instead of whole event resources
+    with descriptions and attendees, and the API has already merged overlaps.
+
+    Args:
+        service: A Google Calendar service object
+        calendar_ids (list): Calendars to query, all in one request
+        time_min (datetime): Start of the range as naive UTC
+        time_max (datetime): End of the range as naive UTC
+
+    Returns:
+        list: (start, end, period) entries ordered by start, with the bounds as
+        naive UTC and the period shaped like an event, or None if a calendar
+        could not be queried
+    """
+    result = service.freebusy().query(
+        body={
+            "timeMin": time_min.isoformat() + "Z",
+            "timeMax": time_max.isoformat() + "Z",
+            "timeZone": get_calendar_timezone(service),
+            "items": [{"id": calendar_id} for calendar_id in calendar_ids],
+        },
+        fields=FREEBUSY_FIELDS,
+    ).execute()
+
+    periods = {}
+    for calendar_id in calendar_ids:
+        calendar = result.get("calendars", {}).get(calendar_id, {})
+        if calendar.get("errors"):
+            logger.warning(
+                "freebusy query failed",
+                extra={"calendar_id": calendar_id, "errors": calendar["errors"]},
+            )
+            return None
+        entries = []
+        for busy in calendar.get("busy", []):
+            period = {"start": {"dateTime": busy["start"]}, "end": {"dateTime": busy["end"]}}
+            start = parse_api_time(period["start"])
+            end = parse_api_time(period["end"])
+            if start and end:
+                entries.append((to_naive_utc(start), to_naive_utc(end), period))
+        periods[calendar_id] = entries
+    return [entry for _, entry in merge_by_start(periods)]
+
+def is_busy(event):
+    """
+    Whether an event blocks time, by the same rules freebusy queries apply.
+
+    Events shown as available, and events the user declined, leave the time free.
+    """
+    if event.get("transparency") == "transparent":
+        return False
+    return not any(
+        attendee.get("self") and attendee.get("responseStatus") == "declined"
+        for attendee in event.get("attendees", ())
+    )
+
+def describe_busy_events(entries):
+    """Get the summary and times of each busy event, for responses that name busy time."""
+    return [
+        {
+            "summary": event.get("summary", "Untitled"),
+            "start": event["start"].get("dateTime", event["start"].get("date")),
+            "end": event["end"].get("dateTime", event["end"].get("date")),
+        }
+        for _, _, event in entries
+        if is_busy(event)
+    ]
+
+def busy_intervals(entries):
+    """
+    Merge overlapping busy entries into busy intervals.
+
+    The entries carry the bounds the event store or the freebusy query already
+    parsed, so no event is parsed here. Events that do not block time (see
+    is_busy) are skipped, so the local copy of a calendar gives the same busy
+    time as a freebusy query.
+
+    Args:
+        entries (list): (start, end, event) entries ordered by start time,
+            from load_busy_events
+
+    Returns:
+        list: Sorted, non-overlapping [start, end] busy intervals as naive UTC
+    """
+    merged = []
+    for start_utc, end_utc, event in entries:
+        if not is_busy(event):
+            continue
+        if merged and start_utc <= merged[-1][1]:
+            # Overlapping or back-to-back, extend the current busy block
+            if end_utc > merged[-1][1]:
+                merged[-1][1] = end_utc
+        else:
+            merged.append([start_utc, end_utc])
+    return merged
+
+def daily_window(day_date, start_hour, end_hour, timezone_id="UTC"):
+    """
+    Get the search window for a day as naive UTC, ending on the next day if needed.
+
+    The hours are wall-clock hours in the calendar's timezone.
+    """
+    window_start = datetime.datetime.combine(day_date, datetime.time(start_hour, 0))
+    if end_hour <= start_hour:
+        next_day = day_date + datetime.timedelta(days=1)
+        window_end = datetime.datetime.combine(next_day, datetime.time(end_hour, 0))
     else:
-        return dt.strftime("%I:%M %p")
+        window_end = datetime.datetime.combine(day_date, datetime.time(end_hour, 0))
+    return local_to_utc(window_start, timezone_id), local_to_utc(window_end, timezone_id)
 
-def parse_event_datetime(event_time_dict):
+def iter_free_gaps(busy, first_date, days, start_hour, end_hour, timezone_id="UTC"):
     """
-    Parse event time dictionary from Google Calendar API into a datetime object.
-    
+    Yield the gaps between merged busy intervals within the daily windows.
+
+    Both the windows and the busy intervals are sorted, so a single pointer sweeps
+    through the busy intervals once for the whole horizon.
+
     Args:
-        event_time_dict (dict): Event time dictionary from Google Calendar API
-        
+        busy (list): Merged busy intervals from busy_intervals
+        first_date (date): First day to search
+        days (int): Number of days to search
+        start_hour (int): Start of the daily window (24-hour format)
+        end_hour (int): End of the daily window, on the next day if not after start_hour
+        timezone_id (str): Timezone of the windows
+
+    Yields:
+        tuple: (day_date, gap_start, gap_end) with the gap as naive UTC
+    """
+    position = 0
+    for day in range(days):
+        day_date = first_date + datetime.timedelta(days=day)
+        window_start, window_end = daily_window(day_date, start_hour, end_hour, timezone_id)
+
+        # Skip busy intervals that ended before this window
+        while position < len(busy) and busy[position][1] <= window_start:
+            position += 1
+
+        cursor = window_start
+        index = position
+        while index < len(busy) and busy[index][0] < window_end:
+            interval_start, interval_end = busy[index]
+            if cursor < interval_start:
+                yield day_date, cursor, interval_start
+            if interval_end > cursor:
+                cursor = interval_end
+            index += 1
+
+        if cursor < window_end:
+            yield day_date, cursor, window_end
+
+def compute_free_slots(busy, first_date, days, start_hour, end_hour, min_duration, timezone_id="UTC"):
+    """
+    Find free slots by clipping merged busy intervals against the daily windows.
+
+    Args:
+        busy (list): Merged busy intervals from busy_intervals
+        first_date (date): First day to search
+        days (int): Number of days to search
+        start_hour (int): Start of the daily window (24-hour format)
+        end_hour (int): End of the daily window, on the next day if not after start_hour
+        min_duration (int): Minimum duration of free time slots in minutes
+        timezone_id (str): Timezone of the windows and of the displayed times
+
     Returns:
-        datetime: Parsed datetime object or None if parsing fails
+        list: Free time slot dictionaries
     """
-    try:
-        if "dateTime" in event_time_dict:
-            dt_str = event_time_dict["dateTime"]
-            if dt_str.endswith("Z"):
-                dt_str = dt_str.replace("Z", "+00:00")
-            elif "+" not in dt_str and "-" not in dt_str[-6:]:
-                dt_str = dt_str + "+00:00"
-            return datetime.datetime.fromisoformat(dt_str)
-        elif "date" in event_time_dict:
-            date_str = event_time_dict["date"]
-            return datetime.datetime.strptime(date_str, "%Y-%m-%d").replace(tzinfo=datetime.timezone.utc)
-        return None
-    except Exception:
-        return None
+    free_slots = []
+    for day_date, gap_start, gap_end in iter_free_gaps(
+        busy, first_date, days, start_hour, end_hour, timezone_id
+    ):
+        duration_minutes = int((gap_end - gap_start).total_seconds() / 60)
+        if duration_minutes >= min_duration:
+            free_slots.append({
+                "date": day_date.strftime("%Y-%m-%d"),
+                "start_time": format_time_for_display(utc_to_local(gap_start, timezone_id)),
+                "end_time": format_time_for_display(utc_to_local(gap_end, timezone_id)),
+                "duration_minutes": duration_minutes,
+                "formatted_duration": f"{duration_minutes // 60}h {duration_minutes % 60}m"
+            })
+    return free_slots
+
+def load_busy_events(service, calendar_ids, time_min, time_max, full_events=False):
+    """
+    Get what fills the time in a range, as events or event-shaped busy periods.
+
+    Busy periods come from a freebusy query, one request for all calendars,
+    unless the local copies of the calendars already cover the range or the
+    events themselves are asked for.
+
+    Args:
+        service: A Google Calendar service object
+        calendar_ids (list): Calendars to check
+        time_min (datetime): Start of the range as naive UTC
+        time_max (datetime): End of the range as naive UTC
+        full_events (bool): Return whole event resources, e.g. for their summaries
+
+    Returns:
+        list: (start, end, event or busy period) entries of all calendars,
+        ordered by start time
+    """
+    events = None
+    held = all(get_event_store(calendar_id).covers(time_min) for calendar_id in calendar_ids)
+    if not full_events and not held:
+        events = fetch_busy_periods(service, calendar_ids, time_min, time_max)
+    if events is None:
+        # Runs on fan-out threads, which need their own service objects
+        results = fan_out(
+            lambda calendar_id: get_event_store(calendar_id).query(
+                get_calendar_service(), time_min, time_max
+            ),
+            calendar_ids,
+        )
+        events = [entry for _, entry in merge_by_start(dict(zip(calendar_ids, results)))]
+    return events
 
 def find_free_time(
     start_date: str,
@@ -41,26 +243,40 @@ def find_free_time(
     start_hour: int = 9,
     end_hour: int = 2,
     min_duration: int = 30,
+    include_busy_events: bool = False,
+    calendar_ids: Optional[list[str]] = None,
 ) -> dict:
     """
     Find available free time slots in Google Calendar within a specified date range.
 
+    Busy time comes from load_busy_events. Time is free only if it is free in
+    every calendar.
+
     Args:
         start_date (str): Start date in YYYY-MM-DD format. If empty string, defaults to today.
         days (int): Number of days to look ahead. Use 1 for today only, 7 for a week, 30 for a month, etc.
         start_hour (int): Start of working hours (24-hour format, default: 9 AM)
         end_hour (int): End of working hours next day (24-hour format, default: 2 AM next day)
         min_duration (int): Minimum duration of free time slots in minutes (default: 30)
+        include_busy_events (bool): Also return the events in the range with their summaries (default: False)
+        calendar_ids (list): IDs of the calendars to check (default: the primary calendar)
 
     Returns:
         dict: Information about available free time slots or error details
     """
     try:
-        print("Finding free time")
-        print("Start date: ", start_date)
-        print("Days: ", days)
-        print("Working hours: ", f"{start_hour}:00 - {end_hour}:00")
-        print("Minimum duration: ", f"{min_duration} minutes")
+        logger.debug(
+            "Finding free time",
+            extra={
+                "start_date": start_date,
+                "days": days,
+                "start_hour": start_hour,
+                "end_hour": end_hour,
+                "min_duration": min_duration,
+                "include_busy_events": include_busy_events,
+                "calendar_ids": calendar_ids,
+            },
+        )
 
         # Get calendar service
         service = get_calendar_service()
@@ -71,16 +287,16 @@ def find_free_time(
                 "free_slots": [],
             }
 
-        # Always use primary calendar
-        calendar_id = "primary"
+        calendar_ids = resolve_calendar_ids(calendar_ids)
+
+        # Days and hours are the calendar's, not the server's or UTC
+        timezone_id = get_calendar_timezone(service)
 
         if not start_date or start_date.strip() == "":
-            start_time = datetime.datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-            print(f"Using current date: {start_time}")
+            first_date = now(timezone_id).date()
         else:
             try:
-                start_time = datetime.datetime.strptime(start_date, "%Y-%m-%d")
-                print(f"Parsed start date: {start_time}")
+                first_date = datetime.date.fromisoformat(start_date.strip())
             except ValueError:
                 return {
                     "status": "error",
@@ -91,185 +307,44 @@ def find_free_time(
         if not days or days < 1:
             days = 1
 
-        end_time = start_time + datetime.timedelta(days=days)
-
-        time_min = start_time.isoformat() + "Z"
-        time_max = end_time.isoformat() + "Z"
-
-        # Call the Calendar API to get events
-        events_result = (
-            service.events()
-            .list(
-                calendarId=calendar_id,
-                timeMin=time_min,
-                timeMax=time_max,
-                maxResults=100,
-                singleEvents=True,
-                orderBy="startTime",
-            )
-            .execute()
-        )
+        # Windows that end after midnight reach into the day after the range
+        start_time = local_to_utc(datetime.datetime.combine(first_date, datetime.time()), timezone_id)
+        last_date = first_date + datetime.timedelta(days=days - 1)
+        end_time = daily_window(last_date, start_hour, end_hour, timezone_id)[1]
 
-        events = events_result.get("items", [])
-        print(f"Retrieved {len(events)} total events from calendar API")
+        events = load_busy_events(
+            service, calendar_ids, start_time, end_time, full_events=include_busy_events
+        )
 
         # Find free time slots
-        free_slots = []
-        current_date = start_time.date()
-        
-        for day in range(days):
-            day_date = current_date + datetime.timedelta(days=day)
-            
-            window_start = datetime.datetime.combine(day_date, datetime.time(start_hour, 0))
-            
-            if end_hour <= start_hour:
-                next_day = day_date + datetime.timedelta(days=1)
-                window_end = datetime.datetime.combine(next_day, datetime.time(end_hour, 0))
-            else:
-                window_end = datetime.datetime.combine(day_date, datetime.time(end_hour, 0))
-            
-            print(f"Search window: {window_start} → {window_end}")
-            
-            # Get events for this window
-            window_events = []
-            for event in events:
-                event_start_dict = event.get("start", {})
-                event_end_dict = event.get("end", {})
-                
-                start_dt = parse_event_datetime(event_start_dict)
-                end_dt = parse_event_datetime(event_end_dict)
-                
-                if start_dt and end_dt:
-                    if start_dt.tzinfo:
-                        start_dt_utc = start_dt.astimezone(datetime.timezone.utc).replace(tzinfo=None)
-                    else:
-                        start_dt_utc = start_dt
-                    
-                    if end_dt.tzinfo:
-                        end_dt_utc = end_dt.astimezone(datetime.timezone.utc).replace(tzinfo=None)
-                    else:
-                        end_dt_utc = end_dt
-                    
-                    if start_dt_utc < window_end and end_dt_utc > window_start:
-                        window_events.append({
-                            "start": start_dt,
-                            "end": end_dt,
-                            "start_utc": start_dt_utc,
-                            "end_utc": end_dt_utc,
-                            "summary": event.get("summary", "Untitled Event")
-                        })
-            
-            window_events.sort(key=lambda x: x["start_utc"])
-            
-            print(f"Found {len(window_events)} events in window")
-            for event in window_events:
-                print(f"  Event: {event['summary']} ({event['start']} → {event['end']})")
-            
-            if not window_events:
-                print("No events found - entire window is free")
-                duration_minutes = int((window_end - window_start).total_seconds() / 60)
-                if duration_minutes >= min_duration:
-                    window_start_display = datetime.datetime.combine(day_date, datetime.time(start_hour, 0))
-                    if end_hour <= start_hour:
-                        next_day = day_date + datetime.timedelta(days=1)
-                        window_end_display = datetime.datetime.combine(next_day, datetime.time(end_hour, 0))
-                    else:
-                        window_end_display = datetime.datetime.combine(day_date, datetime.time(end_hour, 0))
-                    
-                    free_slots.append({
-                        "date": day_date.strftime("%Y-%m-%d"),
-                        "start_time": format_time_for_display(window_start_display),
-                        "end_time": format_time_for_display(window_end_display),
-                        "duration_minutes": duration_minutes,
-                        "formatted_duration": f"{duration_minutes // 60}h {duration_minutes % 60}m"
-                    })
-                    print(f"Added free slot: {format_time_for_display(window_start_display)} - {format_time_for_display(window_end_display)}")
-            else:
-                print(f"Processing {len(window_events)} events for gaps")
-                
-                # Check for free time before first event
-                first_event_start_utc = window_events[0]["start_utc"]
-                first_event_start_display = window_events[0]["start"]
-                
-                if window_start < first_event_start_utc:
-                    duration_minutes = int((first_event_start_utc - window_start).total_seconds() / 60)
-                    if duration_minutes >= min_duration:
-                        window_start_display = datetime.datetime.combine(day_date, datetime.time(start_hour, 0))
-                        
-                        free_slots.append({
-                            "date": day_date.strftime("%Y-%m-%d"),
-                            "start_time": format_time_for_display(window_start_display),
-                            "end_time": format_time_for_display(first_event_start_display),
-                            "duration_minutes": duration_minutes,
-                            "formatted_duration": f"{duration_minutes // 60}h {duration_minutes % 60}m"
-                        })
-                        print(f"Added free slot before first event: {format_time_for_display(window_start_display)} - {format_time_for_display(first_event_start_display)}")
-                
-                # Check for free time between events
-                for i in range(len(window_events) - 1):
-                    current_event_end_utc = window_events[i]["end_utc"]
-                    current_event_end_display = window_events[i]["end"]
-                    next_event_start_utc = window_events[i + 1]["start_utc"]
-                    next_event_start_display = window_events[i + 1]["start"]
-                    
-                    if current_event_end_utc < next_event_start_utc:
-                        duration_minutes = int((next_event_start_utc - current_event_end_utc).total_seconds() / 60)
-                        if duration_minutes >= min_duration:
-                            free_slots.append({
-                                "date": day_date.strftime("%Y-%m-%d"),
-                                "start_time": format_time_for_display(current_event_end_display),
-                                "end_time": format_time_for_display(next_event_start_display),
-                                "duration_minutes": duration_minutes,
-                                "formatted_duration": f"{duration_minutes // 60}h {duration_minutes % 60}m"
-                            })
-                            print(f"Added free slot between events: {format_time_for_display(current_event_end_display)} - {format_time_for_display(next_event_start_display)}")
-                
-                # Check for free time after last event
-                last_event_end_utc = window_events[-1]["end_utc"]
-                last_event_end_display = window_events[-1]["end"]
-                
-                if last_event_end_utc < window_end:
-                    duration_minutes = int((window_end - last_event_end_utc).total_seconds() / 60)
-                    if duration_minutes >= min_duration:
-                        if end_hour <= start_hour:
-                            next_day = day_date + datetime.timedelta(days=1)
-                            window_end_display = datetime.datetime.combine(next_day, datetime.time(end_hour, 0))
-                        else:
-                            window_end_display = datetime.datetime.combine(day_date, datetime.time(end_hour, 0))
-                        
-                        free_slots.append({
-                            "date": day_date.strftime("%Y-%m-%d"),
-                            "start_time": format_time_for_display(last_event_end_display),
-                            "end_time": format_time_for_display(window_end_display),
-                            "duration_minutes": duration_minutes,
-                            "formatted_duration": f"{duration_minutes // 60}h {duration_minutes % 60}m"
-                        })
-                        print(f"Added free slot after last event: {format_time_for_display(last_event_end_display)} - {format_time_for_display(window_end_display)}")
-            
-            # Count slots for this specific day
-            day_slots = [slot for slot in free_slots if slot["date"] == day_date.strftime("%Y-%m-%d")]
-            print(f"Total free slots found for {day_date}: {len(day_slots)}")
-
-        print(f"Overall total free slots found: {len(free_slots)}")
+        busy = busy_intervals(events)
+        free_slots = compute_free_slots(
+            busy, first_date, days, start_hour, end_hour, min_duration, timezone_id
+        )
+
+        logger.debug(
+            "Found free time",
+            extra={"events": len(events), "busy_intervals": len(busy), "free_slots": len(free_slots)},
+        )
         
         if not free_slots:
-            return {
+            result = {
                 "status": "success",
                 "message": f"No free time slots found for the specified period (minimum {min_duration} minutes).",
                 "free_slots": [],
             }
-
-        return {
-            "status": "success",
-            "message": f"Found {len(free_slots)} free time slot(s).",
-            "free_slots": free_slots,
-        }
+        else:
+            result = {
+                "status": "success",
+                "message": f"Found {len(free_slots)} free time slot(s).",
+                "free_slots": free_slots,
+            }
+        if include_busy_events:
+            result["busy_events"] = describe_busy_events(events)
+        return result
 
     except Exception as e:
-        print(f"Exception in find_free_time: {str(e)}")
-        print(f"Exception type: {type(e).__name__}")
-        import traceback
-        print(f"Traceback: {traceback.format_exc()}")
+        logger.exception("Error finding free time")
         return {
             "status": "error",
             "message": f"Error finding free time: {str(e)}",
@@ -1,24 +1,46 @@
 import datetime
-from .utils import format_event_time, get_calendar_service
+from typing import Optional
+from ...telemetry import get_logger
+from .calendar_metadata import get_calendar_timezone
+from .datetimes import local_to_utc, utc_now
+from .event_model import VIEWS, CalendarEvent, description_limit_for
+from .event_store import get_event_store, merge_by_start
+from .executor import fan_out
+from .utils import get_calendar_service, resolve_calendar_ids
+
+logger = get_logger(__name__)
 
 def list_event(
     start_date: str,
     days: int,
+    max_results: int = 100,
+    calendar_ids: Optional[list[str]] = None,
+    detail: str = "summary",
 ) -> dict:
     """
     List upcoming calendar events within a specified date range.
 
+    Several calendars are fetched concurrently and their events merged in
+    start time order. The detail level decides which fields come back:
+    "ids" gives IDs and times, "summary" adds titles and locations, and
+    "full" adds descriptions (shortened to fit a size budget), attendees
+    and links.
+
     Args:
         start_date (str): Start date in YYYY-MM-DD format. If empty string, defaults to today.
         days (int): Number of days to look ahead. Use 1 for today only, 7 for a week, 30 for a month, etc.
+        max_results (int): Maximum number of events to return (default: 100)
+        calendar_ids (list): IDs of the calendars to list (default: the primary calendar)
+        detail (str): "ids", "summary" or "full" (default: "summary")
 
     Returns:
         dict: Information about upcoming events or error details
     """
     try:
-        print("Listing events")
-        print("Start date: ", start_date)
-        print("Days: ", days)
+        logger.debug(
+            "Listing events",
+            extra={"start_date": start_date, "days": days, "calendar_ids": calendar_ids},
+        )
 
         # Get calendar service
         service = get_calendar_service()
@@ -29,17 +51,28 @@ def list_event(
                 "events": [],
             }
 
-        max_results = 100
+        if not max_results or max_results < 1:
+            max_results = 100
 
-        # Always use primary calendar
-        calendar_id = "primary"
+        calendar_ids = resolve_calendar_ids(calendar_ids)
+
+        detail = (detail or "summary").strip().lower()
+        if detail not in VIEWS:
+            return {
+                "status": "error",
+                "message": f"Invalid detail: {detail}. Use ids, summary or full.",
+                "events": [],
+            }
 
-        # Set time range
+        # Set time range, a date starts at midnight in the calendar's timezone
         if not start_date or start_date.strip() == "":
-            start_time = datetime.datetime.utcnow()
+            start_time = utc_now()
         else:
             try:
-                start_time = datetime.datetime.strptime(start_date, "%Y-%m-%d")
+                start_time = local_to_utc(
+                    datetime.datetime.combine(datetime.date.fromisoformat(start_date.strip()), datetime.time()),
+                    get_calendar_timezone(service),
+                )
             except ValueError:
                 return {
                     "status": "error",
@@ -53,57 +86,57 @@ def list_event(
 
         end_time = start_time + datetime.timedelta(days=days)
 
-        # Format times for API call
-        time_min = start_time.isoformat() + "Z"
-        time_max = end_time.isoformat() + "Z"
-
-        # Call the Calendar API
-        events_result = (
-            service.events()
-            .list(
-                calendarId=calendar_id,
-                timeMin=time_min,
-                timeMax=time_max,
-                maxResults=max_results,
-                singleEvents=True,
-                orderBy="startTime",
-            )
-            .execute()
-        )
+        failed = {}
 
-        events = events_result.get("items", [])
+        def fetch(calendar_id):
+            # Runs on a fan-out thread, which needs its own service object
+            try:
+                return get_event_store(calendar_id).query(
+                    get_calendar_service(), start_time, end_time, limit=max_results
+                )
+            except Exception as e:
+                logger.warning("Listing a calendar failed", extra={"calendar_id": calendar_id, "error": str(e)})
+                failed[calendar_id] = str(e)
+                return []
+
+        # Serve the range from the local copy of each calendar
+        results = fan_out(fetch, calendar_ids)
+        if len(failed) == len(calendar_ids):
+            return {
+                "status": "error",
+                "message": f"Error fetching events: {'; '.join(failed.values())}",
+                "events": [],
+            }
+        events = merge_by_start(dict(zip(calendar_ids, results)), limit=max_results)
 
         if not events:
-            return {
+            result = {
                 "status": "success",
                 "message": "No upcoming events found.",
                 "events": [],
             }
+            if failed:
+                result["failed_calendars"] = failed
+            return result
+
+        # Only the fields of the requested view are read and returned
+        description_limit = description_limit_for(len(events))
+        with_calendar = len(calendar_ids) > 1
+        formatted_events = [
+            CalendarEvent.from_api(event, calendar_id, detail).to_dict(
+                detail, description_limit, with_calendar
+            )
+            for calendar_id, (_, _, event) in events
+        ]
 
-        # Format events for display
-        formatted_events = []
-        for event in events:
-            formatted_event = {
-                "id": event.get("id"),
-                "summary": event.get("summary", "Untitled Event"),
-                "start": format_event_time(event.get("start", {})),
-                "end": format_event_time(event.get("end", {})),
-                "location": event.get("location", ""),
-                "description": event.get("description", ""),
-                "attendees": [
-                    attendee.get("email")
-                    for attendee in event.get("attendees", [])
-                    if "email" in attendee
-                ],
-                "link": event.get("htmlLink", ""),
-            }
-            formatted_events.append(formatted_event)
-
-        return {
+        result = {
             "status": "success",
             "message": f"Found {len(formatted_events)} event(s).",
             "events": formatted_events,
         }
+        if failed:
+            result["failed_calendars"] = failed
+        return result
 
     except Exception as e:
         return {
@@ -0,0 +1,74 @@
+import datetime
+import os
+import threading
+from ...telemetry import get_logger
+from .calendar_metadata import calendar_metadata, get_calendar_timezone
+from .datetimes import local_to_utc, now
+from .event_store import get_event_store
+from .utils import get_calendar_service
+
+logger = get_logger(__name__)
+
+# Days from today that are loaded into the event store when a client connects
+PREFETCH_DAYS = int(os.getenv("SCHEDULEAI_PREFETCH_DAYS", "7"))
+
+# Connections arriving while a prefetch runs do not start another one
+_prefetch_lock = threading.Lock()
+
+
+def load_calendar_timezone():
+    """
+    Make sure the calendar timezone is cached before an agent session starts.
+
+    The agent's instruction is built from the cached timezone when the live
+    session opens, so on a cold process a new connection waits a little for
+    this. Once the timezone is known, prefetch_calendar keeps it fresh instead.
+
+    Returns:
+        str: The calendar timezone, or DEFAULT_TIMEZONE if it cannot be read
+    """
+    try:
+        service = get_calendar_service()
+        if service:
+            return get_calendar_timezone(service)
+    except Exception:
+        logger.warning("calendar timezone could not be loaded", exc_info=True)
+    return calendar_metadata.cached_timezone()
+
+
+def prefetch_calendar(days=PREFETCH_DAYS):
+    """
+    Load the calendar metadata and the next days of the primary calendar.
+
+    Run in the background when a client connects, so the first tool call of
+    the session finds both in memory. Once prefetched, the event store's
+    stale-while-revalidate rules decide how long the data is served as is.
+
+    Args:
+        days (int): Number of days from the start of today to load
+
+    Returns:
+        bool: Whether the prefetch ran; False if another one was in progress
+        or authentication failed
+    """
+    if not _prefetch_lock.acquire(blocking=False):
+        return False
+    try:
+        service = get_calendar_service()
+        if not service:
+            return False
+
+        calendar_metadata.get_calendars(service)
+        if days > 0:
+            timezone_id = get_calendar_timezone(service)
+            today = datetime.datetime.combine(now(timezone_id).date(), datetime.time())
+            time_min = local_to_utc(today, timezone_id)
+            get_event_store("primary").query(
+                service, time_min, time_min + datetime.timedelta(days=days), limit=0
+            )
+        return True
+    except Exception:
+        logger.warning("calendar prefetch failed", exc_info=True)
+        return False
+    finally:
+        _prefetch_lock.release()
@@ -0,0 +1,92 @@
+import contextlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    # Windows has no flock; locks then only hold within one process
+    fcntl = None
+
+# SQLite file shared by every worker process for cached calendar data; empty disables it
+CACHE_DB = os.path.expanduser(os.getenv("SCHEDULEAI_CACHE_DB", ""))
+
+
+@contextlib.contextmanager
+def file_lock(path):
+    """
+    Hold an exclusive lock on a lock file, across processes.
+
+    Args:
+        path (Path): The lock file, created if it does not exist
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class SharedCache:
+    """
+    Key-value store in a SQLite file, for data every worker process can reuse.
+
+    Values are stored as JSON with the wall-clock time they were written, so
+    readers can decide how old an entry they accept.
+
+    Args:
+        path (str): The database file
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT, stored_at REAL)"
+        )
+
+    def get(self, key, max_age=None):
+        """
+        Get a cached value.
+
+        Args:
+            key (str): The cache key
+            max_age (float): Oldest entry to accept in seconds, or None for any age
+
+        Returns:
+            The stored value, or None if there is none or it is too old
+        """
+        row = self._connection().execute(
+            "SELECT value, stored_at FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or (max_age is not None and time.time() - row[1] > max_age):
+            return None
+        return json.loads(row[0])
+
+    def put(self, key, value):
+        """Store a JSON-serialisable value under a key."""
+        self._connection().execute(
+            "INSERT OR REPLACE INTO cache (key, value, stored_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value), time.time()),
+        )
+
+    def _connection(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+
+shared_cache = SharedCache(CACHE_DB) if CACHE_DB else None
@@ -0,0 +1,198 @@
+import datetime
+import heapq
+from typing import Optional
+from ...telemetry import get_logger
+from .calendar_metadata import get_calendar_timezone
+from .datetimes import local_to_utc, now, utc_now, utc_to_local
+from .find_free_time import busy_intervals, daily_window, iter_free_gaps, load_busy_events
+from .utils import get_calendar_service, resolve_calendar_ids
+
+logger = get_logger(__name__)
+
+# Most suggestions one call returns
+MAX_SUGGESTIONS = 10
+
+# Candidate start times are on this grid, in minutes
+START_STEP = 15
+
+
+def pad_busy(busy, buffer):
+    """Widen merged busy intervals by a buffer on both sides, merging any that now touch."""
+    if not buffer:
+        return busy
+    padded = []
+    for start, end in busy:
+        start, end = start - buffer, end + buffer
+        if padded and start <= padded[-1][1]:
+            padded[-1][1] = max(padded[-1][1], end)
+        else:
+            padded.append([start, end])
+    return padded
+
+
+def best_start_in_gap(gap_start, gap_end, duration, preferred_start, preferred_end):
+    """
+    Pick the start time in a gap that keeps the meeting closest to the preferred hours.
+
+    Args:
+        gap_start (datetime): Start of the free gap as naive UTC
+        gap_end (datetime): End of the free gap as naive UTC
+        duration (timedelta): Length of the meeting
+        preferred_start (datetime): Start of the preferred hours that day as naive UTC
+        preferred_end (datetime): End of the preferred hours that day as naive UTC
+
+    Returns:
+        tuple: (minutes outside the preferred hours, start) or None if the meeting does not fit
+    """
+    # Round up to the start grid
+    offset = (gap_start - datetime.datetime.min) % datetime.timedelta(minutes=START_STEP)
+    earliest = gap_start + (datetime.timedelta(minutes=START_STEP) - offset if offset else datetime.timedelta(0))
+    latest = gap_end - duration
+    if earliest > latest:
+        return None
+
+    # The earliest start inside the preferred hours, else the fitting start nearest to them
+    start = min(max(earliest, preferred_start), latest)
+    start -= (start - earliest) % datetime.timedelta(minutes=START_STEP)
+    outside = max(preferred_start - start, datetime.timedelta(0)) + max(
+        start + duration - preferred_end, datetime.timedelta(0)
+    )
+    return int(outside.total_seconds() // 60), start
+
+
+def suggest_slots(
+    duration_minutes: int,
+    start_date: str = "",
+    days: int = 7,
+    preferred_start_hour: int = 10,
+    preferred_end_hour: int = 17,
+    buffer_minutes: int = 10,
+    k: int = 5,
+    start_hour: int = 9,
+    end_hour: int = 2,
+    calendar_ids: Optional[list[str]] = None,
+) -> dict:
+    """
+    Suggest the k best start times for a meeting, instead of listing every free gap.
+
+    Each free gap offers at most one candidate, the start closest to the
+    preferred hours. Candidates are ranked by how far they fall outside the
+    preferred hours, then by how soon they start, and only the best k are
+    kept in a bounded heap, so neither the memory nor the response grows
+    with the number of days.
+
+    Args:
+        duration_minutes (int): Length of the meeting in minutes
+        start_date (str): First day to search in YYYY-MM-DD format. If empty string, defaults to today.
+        days (int): Number of days to search (default: 7)
+        preferred_start_hour (int): Start of the preferred hours (24-hour format, default: 10 AM)
+        preferred_end_hour (int): End of the preferred hours (24-hour format, default: 5 PM)
+        buffer_minutes (int): Free time to keep before and after other meetings (default: 10)
+        k (int): Number of suggestions to return (default: 5, at most 10)
+        start_hour (int): Earliest hour a meeting may start (24-hour format, default: 9 AM)
+        end_hour (int): Hour by which a meeting must end, next day if not after start_hour (default: 2 AM)
+        calendar_ids (list): IDs of the calendars that must all be free (default: the primary calendar)
+
+    Returns:
+        dict: The suggested slots, best first, or error details
+    """
+    try:
+        logger.debug(
+            "Suggesting slots",
+            extra={
+                "duration_minutes": duration_minutes,
+                "start_date": start_date,
+                "days": days,
+                "k": k,
+                "calendar_ids": calendar_ids,
+            },
+        )
+
+        if not duration_minutes or duration_minutes < 1:
+            return {
+                "status": "error",
+                "message": "duration_minutes must be a positive number of minutes.",
+                "slots": [],
+            }
+
+        service = get_calendar_service()
+        if not service:
+            return {
+                "status": "error",
+                "message": "Failed to authenticate with Google Calendar",
+                "slots": [],
+            }
+
+        calendar_ids = resolve_calendar_ids(calendar_ids)
+        timezone_id = get_calendar_timezone(service)
+
+        if not start_date or start_date.strip() == "":
+            first_date = now(timezone_id).date()
+        else:
+            try:
+                first_date = datetime.date.fromisoformat(start_date.strip())
+            except ValueError:
+                return {
+                    "status": "error",
+                    "message": f"Invalid date format: {start_date}. Use YYYY-MM-DD format.",
+                    "slots": [],
+                }
+
+        days = max(days or 1, 1)
+        k = min(max(k or 1, 1), MAX_SUGGESTIONS)
+        duration = datetime.timedelta(minutes=duration_minutes)
+        buffer = datetime.timedelta(minutes=max(buffer_minutes or 0, 0))
+
+        start_time = local_to_utc(datetime.datetime.combine(first_date, datetime.time()), timezone_id)
+        last_date = first_date + datetime.timedelta(days=days - 1)
+        end_time = daily_window(last_date, start_hour, end_hour, timezone_id)[1]
+
+        events = load_busy_events(service, calendar_ids, start_time, end_time)
+        busy = pad_busy(busy_intervals(events), buffer)
+
+        earliest = utc_now()
+
+        def candidates():
+            for day_date, gap_start, gap_end in iter_free_gaps(
+                busy, first_date, days, start_hour, end_hour, timezone_id
+            ):
+                preferred_start, preferred_end = daily_window(
+                    day_date, preferred_start_hour, preferred_end_hour, timezone_id
+                )
+                candidate = best_start_in_gap(
+                    max(gap_start, earliest), gap_end, duration, preferred_start, preferred_end
+                )
+                if candidate is not None:
+                    yield candidate
+
+        # nsmallest keeps a heap of k candidates, whatever the number of gaps
+        slots = []
+        for outside, start in heapq.nsmallest(k, candidates()):
+            local_start = utc_to_local(start, timezone_id)
+            local_end = utc_to_local(start + duration, timezone_id)
+            slots.append({
+                "start_time": local_start.strftime("%Y-%m-%d %H:%M"),
+                "end_time": local_end.strftime("%Y-%m-%d %H:%M"),
+                "display": f"{local_start.strftime('%a %Y-%m-%d %I:%M %p')} - {local_end.strftime('%I:%M %p')}",
+                "in_preferred_hours": outside == 0,
+            })
+
+        if not slots:
+            return {
+                "status": "success",
+                "message": f"No {duration_minutes} minute slot is free in the next {days} day(s).",
+                "slots": [],
+            }
+        return {
+            "status": "success",
+            "message": f"Found {len(slots)} suggested slot(s), best first.",
+            "slots": slots,
+        }
+
+    except Exception as e:
+        logger.exception("Error suggesting slots")
+        return {
+            "status": "error",
+            "message": f"Error suggesting slots: {str(e)}",
+            "slots": [],
+        }
@@ -1,11 +1,18 @@
 import json
 import os
-from datetime import datetime
+import threading
+from datetime import timedelta
 from pathlib import Path
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.http import HttpRequest
+from ...telemetry import calendar_api_calls, get_logger
+from .datetimes import now, parse_api_time, utc_now
+from .shared_cache import file_lock
+
+logger = get_logger(__name__)
 
 SCOPES = ["https://www.googleapis.com/auth/calendar"]
 
@@ -13,100 +20,307 @@ SCOPES = ["https://www.googleapis.com/auth/calendar"]
 TOKEN_PATH = Path(os.path.expanduser("~/.credentials/calendar_token.json"))
 CREDENTIALS_PATH = Path("credentials.json")
 
+# Held while the token file is created or refreshed, so worker processes take turns
+TOKEN_LOCK_PATH = TOKEN_PATH.with_name(TOKEN_PATH.name + ".lock")
+
+# Event properties the tools read, requested as a partial response
+EVENT_FIELDS = (
+    "id,etag,status,summary,description,location,start,end,transparency,"
+    "attendees(email,self,responseStatus),htmlLink,recurringEventId"
+)
+
+# Largest page the Calendar API allows for events().list
+MAX_PAGE_SIZE = 2500
+
+# Refresh the access token this long before it actually expires
+REFRESH_AHEAD = timedelta(minutes=5)
+
+# Process-wide client state shared by all tools
+_credentials_lock = threading.Lock()
+_credentials = None
+_discovery_document = None
+_generation = 0
+_local = threading.local()
+_service_override = None
+
+
+class CountingHttpRequest(HttpRequest):
+    """HttpRequest that counts every Calendar API call it makes."""
+
+    def execute(self, http=None, num_retries=0):
+        calendar_api_calls.inc(method=self.methodId or "unknown")
+        return super().execute(http=http, num_retries=num_retries)
+
+
+def _read_token():
+    """Read the credentials in the token file, or None if there is no token yet."""
+    if not TOKEN_PATH.exists():
+        return None
+    return Credentials.from_authorized_user_info(
+        json.loads(TOKEN_PATH.read_text()), SCOPES
+    )
+
+
+def _load_credentials():
+    """
+    Load credentials from the token file, or run the OAuth flow if there is none.
+
+    The flow runs under the token file lock, so when several workers start at
+    once only one opens the browser and the others read the token it saved.
+
+    Returns:
+        Credentials: The loaded credentials or None if authentication fails
+    """
+    creds = _read_token()
+    if creds and (creds.valid or creds.refresh_token):
+        return creds
+
+    with file_lock(TOKEN_LOCK_PATH):
+        # Another worker may have finished the flow while we waited
+        creds = _read_token()
+        if creds and (creds.valid or creds.refresh_token):
+            return creds
+
+        if not CREDENTIALS_PATH.exists():
+            logger.error(
+                f"{CREDENTIALS_PATH} not found. Please follow setup instructions."
+            )
+            return None
+
+        # Only the first login needs the OAuth flow, so it is imported here
+        from google_auth_oauthlib.flow import InstalledAppFlow
+
+        flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_PATH, SCOPES)
+        creds = flow.run_local_server(port=0)
+        _save_credentials(creds)
+
+    return creds
+
+
+def _save_credentials(creds):
+    """Save the credentials for the next run, replacing the file atomically."""
+    TOKEN_PATH.parent.mkdir(parents=True, exist_ok=True)
+    temporary = TOKEN_PATH.with_name(f"{TOKEN_PATH.name}.{os.getpid()}.tmp")
+    temporary.write_text(creds.to_json())
+    os.replace(temporary, TOKEN_PATH)
+
+
+def _refresh_credentials(creds):
+    """
+    Refresh the credentials, unless another worker already did.
+
+    The token file is re-read under its lock; if it holds a token that is not
+    due for refresh, that one is adopted instead of refreshing again.
+    """
+    with file_lock(TOKEN_LOCK_PATH):
+        stored = _read_token()
+        if stored is not None and stored.token and not _needs_refresh(stored):
+            # Update in place, the per-thread services hold this object
+            creds.token = stored.token
+            creds.expiry = stored.expiry
+            return
+        creds.refresh(Request())
+        _save_credentials(creds)
+
+
+def _needs_refresh(creds):
+    """Check whether the token is expired or about to expire."""
+    if not creds.token:
+        return True
+    if not creds.expiry:
+        return False
+    return creds.expiry - REFRESH_AHEAD <= utc_now()
+
+
+def get_credentials():
+    """
+    Get the process-wide credentials, refreshing them ahead of expiry.
+
+    The token file is read once per process. Refreshes happen behind a lock,
+    and a lock file across processes, so neither concurrent tool calls nor
+    several workers refresh the same token twice.
+
+    Returns:
+        Credentials: Valid credentials or None if authentication fails
+    """
+    global _credentials
+
+    creds = _credentials
+    if creds is not None and not _needs_refresh(creds):
+        return creds
+
+    with _credentials_lock:
+        # Another thread may have loaded or refreshed while we waited
+        if _credentials is None:
+            _credentials = _load_credentials()
+        creds = _credentials
+        if creds is not None and _needs_refresh(creds) and creds.refresh_token:
+            _refresh_credentials(creds)
+        return creds
+
+
+def _get_discovery_document():
+    """Load the Calendar v3 discovery document from the bundled static copy once."""
+    global _discovery_document
+
+    if _discovery_document is None:
+        with _credentials_lock:
+            if _discovery_document is None:
+                _discovery_document = json.loads(get_static_doc("calendar", "v3"))
+    return _discovery_document
+
 
 def get_calendar_service():
     """
-    Authenticate and create a Google Calendar service object.
+    Get a Google Calendar service object.
+
+    Credentials and the discovery document are shared by the whole process.
+    Each thread gets its own service object because the underlying HTTP
+    transport is not thread-safe, so it is built once per thread and reused.
 
     Returns:
         A Google Calendar service object or None if authentication fails
     """
-    creds = None
+    if _service_override is not None:
+        return _service_override
+
+    creds = get_credentials()
+    if not creds:
+        return None
 
-    # Check if token exists and is valid
-    if TOKEN_PATH.exists():
-        creds = Credentials.from_authorized_user_info(
-            json.loads(TOKEN_PATH.read_text()), SCOPES
+    if getattr(_local, "generation", None) != _generation:
+        _local.service = build_from_document(
+            _get_discovery_document(),
+            credentials=creds,
+            requestBuilder=CountingHttpRequest,
         )
+        _local.generation = _generation
+    return _local.service
 
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            if not CREDENTIALS_PATH.exists():
-                print(
-                    f"Error: {CREDENTIALS_PATH} not found. Please follow setup instructions."
-                )
-                return None
 
-            flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_PATH, SCOPES)
-            creds = flow.run_local_server(port=0)
+def override_calendar_service(service):
+    """
+    Make every tool use the given service object, e.g. an offline stand-in.
 
-        # Save the credentials for the next run
-        TOKEN_PATH.parent.mkdir(parents=True, exist_ok=True)
-        TOKEN_PATH.write_text(creds.to_json())
+    Args:
+        service: The service object to use, or None to go back to the real client
+    """
+    global _service_override
 
-    # Create and return the Calendar service
-    return build("calendar", "v3", credentials=creds)
+    _service_override = service
 
-def format_event_time(event_time):
+
+def reset_calendar_service():
     """
-    Format an event time into a human-readable string.
+    Drop the cached credentials and service objects so the next call starts cold.
+    """
+    global _credentials, _discovery_document, _generation
+
+    with _credentials_lock:
+        _credentials = None
+        _discovery_document = None
+        _generation += 1
+
+def iter_event_pages(service, calendar_id, page_size=MAX_PAGE_SIZE, **params):
+    """
+    Lazily yield events().list result pages, following nextPageToken.
+
+    Only the fields in EVENT_FIELDS are requested, plus the page and sync tokens.
 
     Args:
-        event_time (dict): The event time dictionary from Google Calendar API
+        service: A Google Calendar service object
+        calendar_id (str): The calendar to list
+        page_size (int): Number of events to request per page
+        **params: Other events().list parameters, e.g. timeMin or syncToken
 
-    Returns:
-        str: A human-readable time string
+    Yields:
+        dict: One result page, including "items" and the next page or sync token
     """
-    if "dateTime" in event_time:
-        
-        dt = datetime.fromisoformat(event_time["dateTime"].replace("Z", "+00:00"))
-        return dt.strftime("%Y-%m-%d %I:%M %p")
-    elif "date" in event_time:
-        return f"{event_time['date']} (All day)"
-    return "Unknown time format"
+    page_token = None
+    while True:
+        page = (
+            service.events()
+            .list(
+                calendarId=calendar_id,
+                maxResults=page_size,
+                pageToken=page_token,
+                fields=f"nextPageToken,nextSyncToken,items({EVENT_FIELDS})",
+                **params,
+            )
+            .execute()
+        )
+        yield page
+
+        page_token = page.get("nextPageToken")
+        if not page_token:
+            return
 
-def parse_datetime(datetime_str):
+
+def iter_events(service, calendar_id, limit=None, **params):
     """
-    Parse a datetime string into a datetime object.
+    Lazily yield events across pages, stopping once limit events were yielded.
 
     Args:
-        datetime_str (str): A string representing a date and time
+        service: A Google Calendar service object
+        calendar_id (str): The calendar to list
+        limit (int): Maximum number of events to fetch, or None for all of them
+        **params: Other events().list parameters, e.g. timeMin or orderBy
+
+    Yields:
+        dict: Event resources in API order
+    """
+    if limit is not None and limit < 1:
+        return
+
+    page_size = MAX_PAGE_SIZE if limit is None else min(limit, MAX_PAGE_SIZE)
+    count = 0
+    for page in iter_event_pages(service, calendar_id, page_size, **params):
+        for event in page.get("items", []):
+            yield event
+            count += 1
+            if limit is not None and count >= limit:
+                return
+
+def resolve_calendar_ids(calendar_ids):
+    """
+    Clean up the calendar IDs a tool was called with.
+
+    Args:
+        calendar_ids (list): Calendar IDs, or None/empty for the primary calendar
 
     Returns:
-        datetime: A datetime object or None if parsing fails
+        list: The distinct non-empty IDs in their original order, or ["primary"]
     """
-    formats = [
-        "%Y-%m-%d %H:%M",
-        "%Y-%m-%d %I:%M %p",
-        "%Y-%m-%d",
-        "%m/%d/%Y %H:%M",
-        "%m/%d/%Y %I:%M %p",
-        "%m/%d/%Y",
-        "%B %d, %Y %H:%M",
-        "%B %d, %Y %I:%M %p",
-        "%B %d, %Y",
-    ]
+    ids = [calendar_id.strip() for calendar_id in calendar_ids or [] if calendar_id and calendar_id.strip()]
+    return list(dict.fromkeys(ids)) or ["primary"]
 
-    for fmt in formats:
-        try:
-            return datetime.strptime(datetime_str, fmt)
-        except ValueError:
-            continue
+def format_event_time(event_time):
+    """
+    Format an event time into a human-readable string.
 
-    return None
+    Args:
+        event_time (dict): The event time dictionary from Google Calendar API
+
+    Returns:
+        str: A human-readable time string
+    """
+    if "dateTime" in event_time:
+        dt = parse_api_time(event_time)
+        return dt.strftime("%Y-%m-%d %I:%M %p") if dt else "Unknown time format"
+    elif "date" in event_time:
+        return f"{event_time['date']} (All day)"
+    return "Unknown time format"
 
-def get_current_time() -> dict:
+def get_current_time(timezone_id: str = "") -> dict:
     """
-    Get the current time and date
+    Get the current time and date, in the given timezone or UTC
     """
-    now = datetime.now()
+    current = now(timezone_id)
 
     # Format date as MM-DD-YYYY
-    formatted_date = now.strftime("%m-%d-%Y")
+    formatted_date = current.strftime("%m-%d-%Y")
 
     return {
-        "current_time": now.strftime("%Y-%m-%d %H:%M:%S"),
+        "current_time": current.strftime("%Y-%m-%d %H:%M:%S"),
         "formatted_date": formatted_date,
     }
\ No newline at end of file
@@ -0,0 +1,137 @@
+import asyncio
+import collections
+import os
+import time
+import uuid
+from .telemetry import get_logger
+
+logger = get_logger(__name__)
+
+# Number of audio sessions kept connected to the live model ahead of time; 0 disables the pool
+WARM_POOL_SIZE = int(os.getenv("SCHEDULEAI_WARM_POOL_SIZE", "0"))
+
+# Warm sessions older than this are closed rather than handed out, before the model times them out
+WARM_POOL_MAX_AGE = float(os.getenv("SCHEDULEAI_WARM_POOL_MAX_AGE", "300"))
+
+_END = object()
+
+
+class WarmSession:
+    """
+    A live agent stream started before any client asked for it.
+
+    Iterating the stream is what opens the live model connection, so a pump
+    task starts iterating right away and buffers whatever arrives until a
+    client takes the session over through events().
+    """
+
+    def __init__(self, session_id, live_events, live_request_queue):
+        self.session_id = session_id
+        self.live_request_queue = live_request_queue
+        self.created_at = time.monotonic()
+        self._live_events = live_events
+        self._buffer = asyncio.Queue()
+        self._pump = asyncio.create_task(self._run_pump())
+
+    async def _run_pump(self):
+        try:
+            async for event in self._live_events:
+                await self._buffer.put(event)
+        finally:
+            await self._buffer.put(_END)
+
+    def usable(self):
+        """Whether the stream is still open and young enough to hand out."""
+        return (
+            not self._pump.done()
+            and time.monotonic() - self.created_at < WARM_POOL_MAX_AGE
+        )
+
+    async def events(self):
+        """Yield the stream's events, starting with any buffered ones."""
+        while True:
+            event = await self._buffer.get()
+            if event is _END:
+                if not self._pump.cancelled() and self._pump.exception():
+                    raise self._pump.exception()
+                return
+            yield event
+
+    async def close(self):
+        """Stop the stream and the model connection behind it."""
+        self.live_request_queue.close()
+        self._pump.cancel()
+        await asyncio.gather(self._pump, return_exceptions=True)
+        await self._live_events.aclose()
+
+
+class WarmPool:
+    """
+    Live audio sessions opened ahead of time, so a new client skips connection setup.
+
+    Args:
+        start (callable): Coroutine function that starts a session, given its id;
+            returns (live_events, live_request_queue)
+        release (callable): Coroutine function that deletes a session discarded
+            before use, given its id
+        size (int): Number of sessions to keep ready
+    """
+
+    def __init__(self, start, release, size=WARM_POOL_SIZE):
+        self.start = start
+        self.release = release
+        self.size = size
+        self._ready = collections.deque()
+        self._filling = None
+
+    def fill(self):
+        """
+        Top the pool up to its size in the background.
+
+        Returns:
+            The task doing it; a fill already running is reused rather than doubled
+        """
+        if self._filling is None or self._filling.done():
+            self._filling = asyncio.create_task(self._fill())
+        return self._filling
+
+    async def _fill(self):
+        try:
+            while len(self._ready) < self.size:
+                session_id = f"warm-{uuid.uuid4().hex}"
+                live_events, live_request_queue = await self.start(session_id)
+                self._ready.append(WarmSession(session_id, live_events, live_request_queue))
+                logger.debug("warm session started", extra={"session_id": session_id})
+        except Exception:
+            # Clients get a fresh session meanwhile; the next take() tries again
+            logger.warning("warm pool fill failed", exc_info=True)
+
+    async def take(self):
+        """
+        Hand out a ready session and start a replacement.
+
+        Returns:
+            A WarmSession, or None if the pool is empty or disabled
+        """
+        session = None
+        while self._ready and session is None:
+            candidate = self._ready.popleft()
+            if candidate.usable():
+                session = candidate
+            else:
+                await self._discard(candidate)
+        self.fill()
+        return session
+
+    async def close(self):
+        """Close every session still in the pool."""
+        if self._filling is not None:
+            self._filling.cancel()
+            await asyncio.gather(self._filling, return_exceptions=True)
+        while self._ready:
+            await self._discard(self._ready.popleft())
+
+    async def _discard(self, session):
+        await session.close()
+        await self.release(session.session_id)
+        logger.debug("warm session discarded", extra={"session_id": session.session_id})
@@ -0,0 +1,511 @@
+import atexit
+import collections
+import contextlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from google.adk.events.event import Event
+from google.adk.sessions.base_session_service import (
+    BaseSessionService,
+    ListEventsResponse,
+    ListSessionsResponse,
+)
+from google.adk.sessions.in_memory_session_service import InMemorySessionService
+from google.adk.sessions.session import Session
+from google.adk.sessions.state import State
+from .telemetry import get_logger, sessions_closed, sessions_evicted, sessions_stored
+
+logger = get_logger(__name__)
+
+# Sessions without a connected client are evicted after this many idle seconds
+SESSION_TTL = float(os.getenv("SCHEDULEAI_SESSION_TTL", "1800"))
+
+# Most sessions kept at once; the least recently used idle ones go first
+MAX_SESSIONS = int(os.getenv("SCHEDULEAI_MAX_SESSIONS", "1000"))
+
+# Where sessions are kept: "memory" for this process only, "sqlite" to share them and survive restarts
+SESSION_STORE = os.getenv("SCHEDULEAI_SESSION_STORE", "memory")
+SESSION_DB = os.getenv("SCHEDULEAI_SESSION_DB", "sessions.db")
+
+# Seconds between writes of queued session events to the database
+SESSION_FLUSH_INTERVAL = float(os.getenv("SCHEDULEAI_SESSION_FLUSH_INTERVAL", "0.05"))
+
+
+class BoundedSessionService(InMemorySessionService):
+    """
+    In-memory session service with a bound on how many sessions it keeps.
+
+    Sessions are either live, with a client connected, or idle. Clients are
+    expected to delete their session on disconnect via disconnect(); idle
+    sessions that remain (the connection died before cleanup ran, or a
+    caller created one and never used it) are evicted once they pass the TTL
+    or the store is over MAX_SESSIONS. Live sessions are never evicted.
+
+    Args:
+        max_sessions (int): Most sessions kept at once
+        ttl (float): Seconds an idle session is kept after its last use
+    """
+
+    def __init__(self, max_sessions=MAX_SESSIONS, ttl=SESSION_TTL):
+        super().__init__()
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        # (app_name, user_id, session_id) -> last use, least recently used first
+        self._last_used = collections.OrderedDict()
+        self._live = set()
+
+    def create_session(self, *, app_name, user_id, state=None, session_id=None):
+        session = super().create_session(
+            app_name=app_name, user_id=user_id, state=state, session_id=session_id
+        )
+        self._touch((app_name, user_id, session.id))
+        self.evict_idle()
+        return session
+
+    def get_session(self, *, app_name, user_id, session_id, config=None):
+        session = super().get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id, config=config
+        )
+        if session is not None:
+            self._touch((app_name, user_id, session_id))
+        return session
+
+    def append_event(self, session, event):
+        key = (session.app_name, session.user_id, session.id)
+        if key in self._last_used:
+            self._touch(key)
+        return super().append_event(session=session, event=event)
+
+    def delete_session(self, *, app_name, user_id, session_id):
+        # Pop directly; the base class copies the whole session just to check it exists
+        users = self.sessions.get(app_name, {})
+        sessions = users.get(user_id, {})
+        sessions.pop(session_id, None)
+        if not sessions:
+            users.pop(user_id, None)
+            self.user_state.get(app_name, {}).pop(user_id, None)
+        self._last_used.pop((app_name, user_id, session_id), None)
+        self._live.discard((app_name, user_id, session_id))
+        self._update_gauges()
+
+    def connect(self, *, app_name, user_id, session_id):
+        """Mark a session as live, so it is never evicted while a client uses it."""
+        key = (app_name, user_id, session_id)
+        self._live.add(key)
+        self._touch(key)
+
+    def disconnect(self, *, app_name, user_id, session_id, delete=True):
+        """
+        Mark a session as no longer live, deleting it unless asked to keep it.
+
+        Args:
+            app_name (str): App the session belongs to
+            user_id (str): User the session belongs to
+            session_id (str): The session
+            delete (bool): Delete the session now rather than leave it to expire
+        """
+        key = (app_name, user_id, session_id)
+        self._live.discard(key)
+        if delete:
+            self.delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+            sessions_closed.inc()
+        else:
+            self._touch(key)
+
+    def evict_idle(self):
+        """Evict idle sessions past the TTL, then the oldest ones over the size bound."""
+        now = time.monotonic()
+        over = len(self._last_used) - self.max_sessions
+        for key, last_used in list(self._last_used.items()):
+            if key in self._live:
+                continue
+            if now - last_used > self.ttl:
+                reason = "ttl"
+            elif over > 0:
+                reason = "capacity"
+            else:
+                # Ordered by last use, so every later session is newer
+                break
+            self.delete_session(app_name=key[0], user_id=key[1], session_id=key[2])
+            sessions_evicted.inc(reason=reason)
+            logger.info("session evicted", extra={"session_id": key[2], "reason": reason})
+            over -= 1
+        self._update_gauges()
+
+    def _touch(self, key):
+        self._last_used[key] = time.monotonic()
+        self._last_used.move_to_end(key)
+        self._update_gauges()
+
+    def _update_gauges(self):
+        live = len(self._live)
+        sessions_stored.set(live, state="live")
+        sessions_stored.set(len(self._last_used) - live, state="idle")
+
+
+class SqliteSessionService(BaseSessionService):
+    """
+    Session service backed by a SQLite database in WAL mode.
+
+    Several worker processes on one host can share the database, and sessions
+    survive a restart, so a client that reconnects resumes its conversation.
+    Appended events are written behind: they are queued and a background
+    thread writes them in one transaction every SESSION_FLUSH_INTERVAL
+    seconds, so the live event loop never waits on the disk. Anything queued
+    is written before this process reads a session and when a client
+    disconnects, so another worker picking the session up sees all of it.
+
+    Sessions are kept after their client disconnects and deleted once idle
+    for longer than the TTL.
+
+    Args:
+        path (str): Database file
+        flush_interval (float): Seconds between writes of queued events; 0 writes every event at once
+        ttl (float): Seconds an idle session is kept after its last use
+    """
+
+    def __init__(self, path=SESSION_DB, flush_interval=SESSION_FLUSH_INTERVAL, ttl=SESSION_TTL):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.ttl = ttl
+        self._local = threading.local()
+        self._live = set()
+        # (app_name, user_id, session_id, event_json, state_json, timestamp, app_delta, user_delta)
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._create_tables()
+
+        self._writer = None
+        if flush_interval > 0:
+            self._writer = threading.Thread(
+                target=self._run_writer, name="session-writer", daemon=True
+            )
+            self._writer.start()
+            atexit.register(self.close)
+
+    # BaseSessionService
+
+    def create_session(self, *, app_name, user_id, state=None, session_id=None):
+        session_id = session_id.strip() if session_id and session_id.strip() else str(uuid.uuid4())
+        session = Session(
+            app_name=app_name,
+            user_id=user_id,
+            id=session_id,
+            state=state or {},
+            last_update_time=time.time(),
+        )
+        session_state, app_delta, user_delta = _split_state(session.state)
+        with self._transaction() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO sessions (app_name, user_id, id, state, last_update_time)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (app_name, user_id, session_id, json.dumps(session_state), session.last_update_time),
+            )
+            db.execute(
+                "DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                (app_name, user_id, session_id),
+            )
+            self._merge_shared_state(db, app_name, user_id, app_delta, user_delta)
+            session.state = self._load_state(db, app_name, user_id, session_state)
+        self.evict_idle()
+        return session
+
+    def get_session(self, *, app_name, user_id, session_id, config=None):
+        self.flush()
+        db = self._connection()
+        row = db.execute(
+            "SELECT state, last_update_time FROM sessions"
+            " WHERE app_name = ? AND user_id = ? AND id = ?",
+            (app_name, user_id, session_id),
+        ).fetchone()
+        if row is None:
+            return None
+
+        query = "SELECT seq, data FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?"
+        params = [app_name, user_id, session_id]
+        if config and config.after_timestamp:
+            query += " AND timestamp >= ?"
+            params.append(config.after_timestamp)
+        if config and config.num_recent_events:
+            query += " ORDER BY seq DESC LIMIT ?"
+            params.append(config.num_recent_events)
+        query = f"SELECT data FROM ({query}) ORDER BY seq"
+        events = [Event.model_validate_json(data) for data, in db.execute(query, params)]
+
+        return Session(
+            app_name=app_name,
+            user_id=user_id,
+            id=session_id,
+            state=self._load_state(db, app_name, user_id, json.loads(row[0])),
+            events=events,
+            last_update_time=row[1],
+        )
+
+    def list_sessions(self, *, app_name, user_id):
+        self.flush()
+        db = self._connection()
+        rows = db.execute(
+            "SELECT id, state, last_update_time FROM sessions WHERE app_name = ? AND user_id = ?",
+            (app_name, user_id),
+        ).fetchall()
+        return ListSessionsResponse(sessions=[
+            Session(
+                app_name=app_name,
+                user_id=user_id,
+                id=session_id,
+                state=self._load_state(db, app_name, user_id, json.loads(state)),
+                last_update_time=last_update_time,
+            )
+            for session_id, state, last_update_time in rows
+        ])
+
+    def delete_session(self, *, app_name, user_id, session_id):
+        self.flush()
+        with self._transaction() as db:
+            self._delete(db, app_name, user_id, session_id)
+        self._live.discard((app_name, user_id, session_id))
+
+    def list_events(self, *, app_name, user_id, session_id):
+        session = self.get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+        return ListEventsResponse(events=session.events if session else [])
+
+    def append_event(self, session, event):
+        if event.partial:
+            return event
+        super().append_event(session=session, event=event)
+        session.last_update_time = event.timestamp
+
+        session_state, _, _ = _split_state(session.state)
+        app_delta, user_delta = {}, {}
+        if event.actions and event.actions.state_delta:
+            _, app_delta, user_delta = _split_state(event.actions.state_delta)
+
+        with self._pending_lock:
+            self._pending.append((
+                session.app_name,
+                session.user_id,
+                session.id,
+                event.model_dump_json(exclude_none=True),
+                json.dumps(session_state),
+                event.timestamp,
+                app_delta,
+                user_delta,
+            ))
+        if self._writer is None:
+            self.flush()
+        return event
+
+    # Lifecycle, as in BoundedSessionService
+
+    def connect(self, *, app_name, user_id, session_id):
+        """Mark a session as live, so it is never evicted while a client uses it."""
+        self._live.add((app_name, user_id, session_id))
+        self._touch(app_name, user_id, session_id)
+
+    def disconnect(self, *, app_name, user_id, session_id, delete=False):
+        """
+        Mark a session as no longer live and write everything queued for it.
+
+        The session is kept so the client can resume it, unless delete is set.
+
+        Args:
+            app_name (str): App the session belongs to
+            user_id (str): User the session belongs to
+            session_id (str): The session
+            delete (bool): Delete the session now rather than leave it to expire
+        """
+        self._live.discard((app_name, user_id, session_id))
+        if delete:
+            self.delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+            sessions_closed.inc()
+        else:
+            self.flush()
+            self._touch(app_name, user_id, session_id)
+        self._update_gauges()
+
+    def evict_idle(self):
+        """Delete sessions idle for longer than the TTL, unless a client here uses them."""
+        cutoff = time.time() - self.ttl
+        with self._transaction() as db:
+            expired = db.execute(
+                "SELECT app_name, user_id, id FROM sessions WHERE last_update_time < ?",
+                (cutoff,),
+            ).fetchall()
+            for key in expired:
+                if key in self._live:
+                    continue
+                self._delete(db, *key)
+                sessions_evicted.inc(reason="ttl")
+                logger.info("session evicted", extra={"session_id": key[2], "reason": "ttl"})
+        self._update_gauges()
+
+    def flush(self):
+        """Write every queued event now."""
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        with self._transaction() as db:
+            db.executemany(
+                "INSERT INTO events (app_name, user_id, session_id, data, timestamp)"
+                " VALUES (?, ?, ?, ?, ?)",
+                [(app, user, session, data, timestamp) for app, user, session, data, _, timestamp, _, _ in pending],
+            )
+            # Only the latest state of each session needs writing
+            latest = {}
+            for app, user, session, _, state, timestamp, app_delta, user_delta in pending:
+                latest[(app, user, session)] = (state, timestamp)
+                if app_delta or user_delta:
+                    self._merge_shared_state(db, app, user, app_delta, user_delta)
+            db.executemany(
+                "UPDATE sessions SET state = ?, last_update_time = ?"
+                " WHERE app_name = ? AND user_id = ? AND id = ?",
+                [(state, timestamp, *key) for key, (state, timestamp) in latest.items()],
+            )
+
+    def close(self):
+        """Stop the writer thread after writing everything queued."""
+        self._closed = True
+        self._wakeup.set()
+        if self._writer is not None and self._writer is not threading.current_thread():
+            self._writer.join()
+        self.flush()
+
+    # Storage
+
+    def _connection(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        db = self._connection()
+        with self._write_lock:
+            # Take the write lock up front, so concurrent workers queue instead of deadlocking
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+
+    def _create_tables(self):
+        with self._transaction() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                " app_name TEXT, user_id TEXT, id TEXT, state TEXT, last_update_time REAL,"
+                " PRIMARY KEY (app_name, user_id, id))"
+            )
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS events ("
+                " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " app_name TEXT, user_id TEXT, session_id TEXT, data TEXT, timestamp REAL)"
+            )
+            db.execute(
+                "CREATE INDEX IF NOT EXISTS events_by_session"
+                " ON events (app_name, user_id, session_id, seq)"
+            )
+            db.execute("CREATE TABLE IF NOT EXISTS app_states (app_name TEXT PRIMARY KEY, state TEXT)")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS user_states ("
+                " app_name TEXT, user_id TEXT, state TEXT, PRIMARY KEY (app_name, user_id))"
+            )
+
+    def _delete(self, db, app_name, user_id, session_id):
+        db.execute(
+            "DELETE FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+            (app_name, user_id, session_id),
+        )
+        db.execute(
+            "DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?",
+            (app_name, user_id, session_id),
+        )
+
+    def _touch(self, app_name, user_id, session_id):
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE sessions SET last_update_time = ? WHERE app_name = ? AND user_id = ? AND id = ?",
+                (time.time(), app_name, user_id, session_id),
+            )
+        self._update_gauges()
+
+    def _merge_shared_state(self, db, app_name, user_id, app_delta, user_delta):
+        if app_delta:
+            row = db.execute("SELECT state FROM app_states WHERE app_name = ?", (app_name,)).fetchone()
+            state = {**(json.loads(row[0]) if row else {}), **app_delta}
+            db.execute(
+                "INSERT OR REPLACE INTO app_states (app_name, state) VALUES (?, ?)",
+                (app_name, json.dumps(state)),
+            )
+        if user_delta:
+            row = db.execute(
+                "SELECT state FROM user_states WHERE app_name = ? AND user_id = ?",
+                (app_name, user_id),
+            ).fetchone()
+            state = {**(json.loads(row[0]) if row else {}), **user_delta}
+            db.execute(
+                "INSERT OR REPLACE INTO user_states (app_name, user_id, state) VALUES (?, ?, ?)",
+                (app_name, user_id, json.dumps(state)),
+            )
+
+    def _load_state(self, db, app_name, user_id, session_state):
+        """Merge app and user state into a session's own state, with their prefixes."""
+        state = dict(session_state)
+        row = db.execute("SELECT state FROM app_states WHERE app_name = ?", (app_name,)).fetchone()
+        if row:
+            state.update({State.APP_PREFIX + key: value for key, value in json.loads(row[0]).items()})
+        row = db.execute(
+            "SELECT state FROM user_states WHERE app_name = ? AND user_id = ?",
+            (app_name, user_id),
+        ).fetchone()
+        if row:
+            state.update({State.USER_PREFIX + key: value for key, value in json.loads(row[0]).items()})
+        return state
+
+    def _run_writer(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            try:
+                self.flush()
+            except sqlite3.Error:
+                logger.exception("writing session events failed")
+
+    def _update_gauges(self):
+        live = len(self._live)
+        total = self._connection().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        sessions_stored.set(live, state="live")
+        sessions_stored.set(max(total - live, 0), state="idle")
+
+
+def _split_state(state):
+    """Split a state dict into session, app and user state, dropping temporary keys."""
+    session_state, app_state, user_state = {}, {}, {}
+    for key, value in state.items():
+        if key.startswith(State.APP_PREFIX):
+            app_state[key.removeprefix(State.APP_PREFIX)] = value
+        elif key.startswith(State.USER_PREFIX):
+            user_state[key.removeprefix(State.USER_PREFIX)] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            session_state[key] = value
+    return session_state, app_state, user_state
+
+
+def create_session_service():
+    """Create the session service selected by SCHEDULEAI_SESSION_STORE, "memory" or "sqlite"."""
+    if SESSION_STORE == "sqlite":
+        return SqliteSessionService()
+    if SESSION_STORE != "memory":
+        raise ValueError(f"Unknown SCHEDULEAI_SESSION_STORE: {SESSION_STORE}")
+    return BoundedSessionService()
@@ -6,6 +6,12 @@ let currentMessageId = null;
 let typingIndicator = null;
 let latestUserMessageElement = null;
 
+// Binary frame header: one byte for the payload kind, followed by the raw payload
+const FRAME_AUDIO_PCM = 0x01;
+
+// Milliseconds of microphone audio sent per frame, instead of one frame per 8 ms render quantum
+const AUDIO_FRAME_MS = 80;
+
 const messageForm = document.getElementById("messageForm");
 const messageInput = document.getElementById("message");
 const messagesDiv = document.getElementById("messages");
@@ -18,8 +24,9 @@ const recordingContainer = document.getElementById("recording-container");
 // WebSocket handlers
 function connectWebsocket() {
   // Connect websocket
-  const wsUrl = ws_url + "?is_audio=" + is_audio;
+  const wsUrl = ws_url + "?is_audio=" + is_audio + "&binary=true";
   websocket = new WebSocket(wsUrl);
+  websocket.binaryType = "arraybuffer";
 
   websocket.onopen = function () {
     console.log("WebSocket connection opened.");
@@ -33,8 +40,10 @@ function connectWebsocket() {
   // Handle incoming messages
   websocket.onmessage = function (event) {
     // Parse the incoming message
-    const message_from_server = JSON.parse(event.data);
-    console.log("[AGENT TO CLIENT] ", message_from_server);
+    const message_from_server = parseServerMessage(event.data);
+    if (message_from_server.mime_type !== "audio/pcm") {
+      console.log("[AGENT TO CLIENT] ", message_from_server);
+    }
 
     if (
       !message_from_server.turn_complete &&
@@ -57,7 +66,7 @@ function connectWebsocket() {
 
     // Handle audio messages
     if (message_from_server.mime_type === "audio/pcm" && audioPlayerNode) {
-      audioPlayerNode.port.postMessage(base64ToArray(message_from_server.data));
+      audioPlayerNode.port.postMessage(message_from_server.data);
 
       if (currentMessageId) {
         const messageElem = document.getElementById(currentMessageId);
@@ -188,6 +197,33 @@ function sendMessage(message) {
   }
 }
 
+// Send raw PCM audio to the server in a binary frame
+function sendAudio(pcmData) {
+  if (websocket && websocket.readyState == WebSocket.OPEN) {
+    const frame = new Uint8Array(1 + pcmData.byteLength);
+    frame[0] = FRAME_AUDIO_PCM;
+    frame.set(new Uint8Array(pcmData), 1);
+    websocket.send(frame.buffer);
+  }
+}
+
+// Turn a server frame into a message, with audio data as an ArrayBuffer
+function parseServerMessage(data) {
+  if (data instanceof ArrayBuffer) {
+    const kind = new Uint8Array(data, 0, 1)[0];
+    if (kind !== FRAME_AUDIO_PCM) {
+      return { mime_type: "unknown" };
+    }
+    return { mime_type: "audio/pcm", data: data.slice(1), role: "model" };
+  }
+
+  const message = JSON.parse(data);
+  if (message.mime_type === "audio/pcm") {
+    message.data = base64ToArray(message.data);
+  }
+  return message;
+}
+
 // Decode Base64 data to Array
 function base64ToArray(base64) {
   const binaryString = window.atob(base64);
@@ -222,7 +258,7 @@ function startAudio() {
     audioPlayerContext = ctx;
   });
   // Start audio input
-  startAudioRecorderWorklet(audioRecorderHandler).then(
+  startAudioRecorderWorklet(audioRecorderHandler, AUDIO_FRAME_MS).then(
     ([node, ctx, stream]) => {
       audioRecorderNode = node;
       audioRecorderContext = ctx;
@@ -292,11 +328,8 @@ stopAudioButton.addEventListener("click", () => {
 function audioRecorderHandler(pcmData) {
   if (!isRecording) return;
 
-  // Send the pcm data as base64
-  sendMessage({
-    mime_type: "audio/pcm",
-    data: arrayBufferToBase64(pcmData),
-  });
+  // Send the pcm data as a binary frame
+  sendAudio(pcmData);
 
   // Log every few samples to avoid flooding the console
   if (Math.random() < 0.01) {
@@ -305,17 +338,6 @@ function audioRecorderHandler(pcmData) {
   }
 }
 
-// Encode an array buffer with Base64
-function arrayBufferToBase64(buffer) {
-  let binary = "";
-  const bytes = new Uint8Array(buffer);
-  const len = bytes.byteLength;
-  for (let i = 0; i < len; i++) {
-    binary += String.fromCharCode(bytes[i]);
-  }
-  return window.btoa(binary);
-}
-
 function insertTypingIndicatorAfter(element) {
   removeTypingIndicator();
   typingIndicator = document.createElement("div");
@@ -1,6 +1,7 @@
 let micStream;
 
-export async function startAudioRecorderWorklet(audioRecorderHandler) {
+// frameMs sets how much audio each frame handed to audioRecorderHandler holds
+export async function startAudioRecorderWorklet(audioRecorderHandler, frameMs = 80) {
   // Create an AudioContext
   const audioRecorderContext = new AudioContext({ sampleRate: 16000 });
   console.log("AudioContext sample rate:", audioRecorderContext.sampleRate);
@@ -18,7 +19,8 @@ export async function startAudioRecorderWorklet(audioRecorderHandler) {
   // Create an AudioWorkletNode that uses the PCMProcessor
   const audioRecorderNode = new AudioWorkletNode(
     audioRecorderContext,
-    "pcm-recorder-processor"
+    "pcm-recorder-processor",
+    { processorOptions: { frameMs } }
   );
 
   // Connect the microphone source to the worklet.
@@ -1,18 +1,37 @@
 class PCMProcessor extends AudioWorkletProcessor {
-    constructor() {
+    constructor(options) {
       super();
+      // Collect this many milliseconds of audio before posting a frame
+      const frameMs = (options.processorOptions && options.processorOptions.frameMs) || 80;
+      this.frameSize = Math.round((sampleRate * frameMs) / 1000);
+      this.frame = new Float32Array(this.frameSize);
+      this.frameLength = 0;
     }
   
     process(inputs, outputs, parameters) {
       if (inputs.length > 0 && inputs[0].length > 0) {
         // Use the first channel
         const inputChannel = inputs[0][0];
-        // Copy the buffer to avoid issues with recycled memory
-        const inputCopy = new Float32Array(inputChannel);
-        this.port.postMessage(inputCopy);
+        let offset = 0;
+        while (offset < inputChannel.length) {
+          const count = Math.min(
+            inputChannel.length - offset,
+            this.frameSize - this.frameLength
+          );
+          this.frame.set(inputChannel.subarray(offset, offset + count), this.frameLength);
+          this.frameLength += count;
+          offset += count;
+
+          // Post a full frame and start a new one; transferring avoids a copy
+          if (this.frameLength === this.frameSize) {
+            this.port.postMessage(this.frame, [this.frame.buffer]);
+            this.frame = new Float32Array(this.frameSize);
+            this.frameLength = 0;
+          }
+        }
       }
       return true;
     }
   }
   
-  registerProcessor("pcm-recorder-processor", PCMProcessor);
\ No newline at end of file
+  registerProcessor("pcm-recorder-processor", PCMProcessor);
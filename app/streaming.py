@@ -0,0 +1,219 @@
+import asyncio
+import base64
+import collections
+import json
+import os
+from .telemetry import TrafficLog, count_bytes, get_logger, outbound_audio_dropped
+
+logger = get_logger(__name__)
+
+# Binary frame header: one byte for the payload kind, followed by the raw payload
+FRAME_AUDIO_PCM = 0x01
+
+# Model audio is 24 kHz 16-bit mono PCM, microphone audio 16 kHz
+AUDIO_BYTES_PER_SECOND = 24000 * 2
+INPUT_AUDIO_BYTES_PER_SECOND = 16000 * 2
+
+# Microphone audio collected before it is passed to the model, in milliseconds; 0 passes every frame on
+INBOUND_AUDIO_FRAME_MS = float(os.getenv("SCHEDULEAI_INBOUND_AUDIO_FRAME_MS", "80"))
+
+# How long a short text or audio frame may wait for more to merge into it, in milliseconds
+COALESCE_MS = float(os.getenv("SCHEDULEAI_COALESCE_MS", "20"))
+
+# Seconds of audio queued for a slow client before the oldest is dropped
+OUTBOUND_AUDIO_BUFFER = float(os.getenv("SCHEDULEAI_OUTBOUND_AUDIO_BUFFER", "2"))
+
+# Audio frames below this size wait for more audio, above MAX a new frame is started
+MIN_AUDIO_FRAME_BYTES = AUDIO_BYTES_PER_SECOND * 40 // 1000
+MAX_AUDIO_FRAME_BYTES = 32 * 1024
+
+TEXT, AUDIO, CONTROL = "text", "audio", "control"
+
+
+class ClientWriter:
+    """
+    Per-connection outbound queue, drained by a single writer task.
+
+    The live event loop only queues frames and never waits on the socket, so a
+    slow client cannot hold up the model stream. While frames wait, consecutive
+    text deltas are merged into one message and consecutive audio parts into
+    one frame; a lone short frame waits up to COALESCE_MS for more to merge.
+
+    Overflow policy: control messages and text are always delivered. Audio is
+    bounded to OUTBOUND_AUDIO_BUFFER seconds, dropping the oldest first, and
+    all queued audio is dropped when the model is interrupted, since the
+    client would only play speech the user already talked over.
+
+    Args:
+        websocket (WebSocket): The client connection
+        binary (bool): Send audio as binary frames instead of Base64 JSON
+        session_id (str): Session the connection belongs to, for metrics and logs
+    """
+
+    def __init__(self, websocket, binary=False, session_id=""):
+        self.websocket = websocket
+        self.binary = binary
+        self.session_id = session_id
+        self.coalesce = COALESCE_MS / 1000
+        self.max_audio_bytes = int(OUTBOUND_AUDIO_BUFFER * AUDIO_BYTES_PER_SECOND)
+        # [kind, payload]; payload is a list of str for text, a bytearray for audio, a dict for control
+        self._pending = collections.deque()
+        self._audio_bytes = 0
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._audio_log = TrafficLog(logger, "agent_to_client", session_id)
+
+    def send_text(self, text):
+        """Queue a partial text delta."""
+        if self._pending and self._pending[-1][0] == TEXT:
+            self._pending[-1][1].append(text)
+        else:
+            self._push(TEXT, [text])
+
+    def send_audio(self, data):
+        """Queue PCM audio, dropping the oldest queued audio if over the bound."""
+        last = self._pending[-1] if self._pending else None
+        if last and last[0] == AUDIO and len(last[1]) < MAX_AUDIO_FRAME_BYTES:
+            last[1].extend(data)
+        else:
+            self._push(AUDIO, bytearray(data))
+        self._audio_bytes += len(data)
+
+        while self._audio_bytes > self.max_audio_bytes:
+            self._drop_audio("overflow", first_only=True)
+
+    def send_control(self, message):
+        """Queue a control message, e.g. turn_complete; interrupted drops queued audio."""
+        if message.get("interrupted"):
+            self._drop_audio("interrupted")
+        self._push(CONTROL, message)
+
+    async def flush(self):
+        """Wait until everything queued so far has been sent."""
+        await self._idle.wait()
+
+    async def run(self):
+        """Send queued frames until the connection closes."""
+        waited = False
+        while True:
+            if not self._pending:
+                self._idle.set()
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            kind, payload = self._pending[0]
+            short = kind == TEXT or (kind == AUDIO and len(payload) < MIN_AUDIO_FRAME_BYTES)
+            if short and len(self._pending) == 1 and not waited and self.coalesce > 0:
+                # Give the model a moment to add to this frame before sending it
+                waited = True
+                await asyncio.sleep(self.coalesce)
+                continue
+
+            waited = False
+            self._pending.popleft()
+            if kind == AUDIO:
+                self._audio_bytes -= len(payload)
+            await self._send(kind, payload)
+
+    def _push(self, kind, payload):
+        self._pending.append([kind, payload])
+        self._idle.clear()
+        self._wakeup.set()
+
+    def _drop_audio(self, reason, first_only=False):
+        kept = collections.deque()
+        dropped = 0
+        for item in self._pending:
+            if item[0] == AUDIO and not (first_only and dropped):
+                dropped += len(item[1])
+            else:
+                kept.append(item)
+        self._pending = kept
+        self._audio_bytes -= dropped
+        if dropped:
+            outbound_audio_dropped.inc(dropped, reason=reason)
+            logger.debug(
+                "outbound audio dropped",
+                extra={"session_id": self.session_id, "reason": reason, "bytes": dropped},
+            )
+
+    async def _send(self, kind, payload):
+        if kind == AUDIO and self.binary:
+            await self.websocket.send_bytes(bytes((FRAME_AUDIO_PCM,)) + payload)
+            count_bytes(self.session_id, "out", len(payload) + 1)
+            self._audio_log.add(len(payload))
+            return
+
+        if kind == AUDIO:
+            message = {
+                "mime_type": "audio/pcm",
+                "data": base64.b64encode(payload).decode("ascii"),
+                "role": "model",
+            }
+            self._audio_log.add(len(payload))
+        elif kind == TEXT:
+            message = {"mime_type": "text/plain", "data": "".join(payload), "role": "model"}
+        else:
+            message = payload
+            self._audio_log.flush()
+
+        message_json = json.dumps(message)
+        await self.websocket.send_text(message_json)
+        count_bytes(self.session_id, "out", len(message_json))
+
+
+class AudioAccumulator:
+    """
+    Collects microphone audio into larger blobs in front of send_realtime.
+
+    Audio is passed on once INBOUND_AUDIO_FRAME_MS of it has arrived, or that
+    long after the first unsent byte, whichever comes first, so clients
+    that send small frames cost one live request per frame period instead of
+    one per message, and no audio waits longer than one period. Clients that
+    already send frames of that size pass straight through.
+
+    Args:
+        live_request_queue (LiveRequestQueue): Queue the audio is sent to
+        frame_ms (float): Milliseconds of audio per blob
+    """
+
+    def __init__(self, live_request_queue, frame_ms=INBOUND_AUDIO_FRAME_MS):
+        # Imported here so loading the server does not load google.genai
+        from google.genai.types import Blob
+
+        self._blob_type = Blob
+        self.live_request_queue = live_request_queue
+        self.frame_ms = frame_ms
+        self.frame_bytes = int(INPUT_AUDIO_BYTES_PER_SECOND * frame_ms / 1000)
+        self._buffer = bytearray()
+        self._timer = None
+
+    def add(self, data):
+        """Queue a chunk of 16 kHz PCM, sending the collected audio if a frame is full."""
+        self._buffer.extend(data)
+        if len(self._buffer) >= self.frame_bytes:
+            self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.frame_ms / 1000, self.flush
+            )
+
+    def flush(self):
+        """Send whatever audio is collected, e.g. before a text message or on close."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._buffer:
+            self.live_request_queue.send_realtime(
+                self._blob_type(data=bytes(self._buffer), mime_type="audio/pcm")
+            )
+            self._buffer.clear()
+
+    def close(self):
+        """Drop the collected audio and stop the flush timer, once the connection is torn down."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._buffer.clear()
@@ -0,0 +1,326 @@
+import atexit
+import bisect
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+# How often per-chunk audio traffic is summarised in the log, in seconds
+AUDIO_LOG_INTERVAL = float(os.getenv("SCHEDULEAI_AUDIO_LOG_INTERVAL", "5"))
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Format log records as one JSON object per line, including `extra` fields."""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def setup_logging(level=None):
+    """
+    Send all "scheduleai" logs through a queue to a background writer thread.
+
+    The event loop only pays for putting the record on the queue; formatting
+    and the stdout write happen on the listener thread.
+
+    Args:
+        level (str): Log level, defaults to the LOG_LEVEL environment variable or INFO
+    """
+    global _listener
+
+    if _listener is not None:
+        return
+
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JsonFormatter())
+
+    log_queue = queue.SimpleQueue()
+    logger = logging.getLogger("scheduleai")
+    logger.setLevel(level or os.getenv("LOG_LEVEL", "INFO"))
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, handler)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def get_logger(name):
+    """Get a logger under the "scheduleai" namespace."""
+    return logging.getLogger(f"scheduleai.{name}")
+
+
+class TrafficLog:
+    """
+    Aggregate per-chunk traffic into one log line per interval.
+
+    Audio arrives about a hundred times per second per speaking user, so logging
+    each chunk would flood the log; this logs the count and bytes instead.
+    """
+
+    def __init__(self, logger, direction, session_id, interval=AUDIO_LOG_INTERVAL):
+        self.logger = logger
+        self.direction = direction
+        self.session_id = session_id
+        self.interval = interval
+        self.chunks = 0
+        self.bytes = 0
+        self._last_flush = time.monotonic()
+
+    def add(self, size):
+        """Count one chunk of size bytes, logging a summary if the interval passed."""
+        self.chunks += 1
+        self.bytes += size
+        if time.monotonic() - self._last_flush >= self.interval:
+            self.flush()
+
+    def flush(self):
+        """Log the traffic since the last summary, if there was any."""
+        if self.chunks:
+            self.logger.info(
+                "audio traffic",
+                extra={
+                    "session_id": self.session_id,
+                    "direction": self.direction,
+                    "chunks": self.chunks,
+                    "bytes": self.bytes,
+                },
+            )
+        self.chunks = 0
+        self.bytes = 0
+        self._last_flush = time.monotonic()
+
+
+class _Metric:
+    """Base class for metrics with a fixed set of label names."""
+
+    type_name = ""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _label_text(self, key, extra=()):
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ""
+        escaped = (
+            (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+            for name, value in pairs
+        )
+        return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+    def remove(self, **labels):
+        """Drop the series for a label set, e.g. when a session ends."""
+        with self._lock:
+            self._values.pop(self._key(labels), None)
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.extend(self._render_value(key, value))
+        return lines
+
+    def _render_value(self, key, value):
+        return [f"{self.name}{self._label_text(key)} {value}"]
+
+
+class Counter(_Metric):
+    """A value that only goes up."""
+
+    type_name = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """A value that can go up and down."""
+
+    type_name = "gauge"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    """Observations counted into cumulative buckets, with their sum and count."""
+
+    type_name = "histogram"
+
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            position = bisect.bisect_left(self.buckets, value)
+            if position < len(self.buckets):
+                series[0][position] += 1
+            series[1] += value
+            series[2] += 1
+
+    def _render_value(self, key, value):
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            labels = self._label_text(key, [("le", str(bound))])
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = self._label_text(key, [("le", "+Inf")])
+        lines.append(f"{self.name}_bucket{labels} {count}")
+        lines.append(f"{self.name}_sum{self._label_text(key)} {total}")
+        lines.append(f"{self.name}_count{self._label_text(key)} {count}")
+        return lines
+
+
+class Registry:
+    """A set of metrics rendered together in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+tool_latency = registry.register(
+    Histogram(
+        "scheduleai_tool_latency_seconds",
+        "Time from tool call to result, including time waiting for a worker.",
+        ["tool"],
+    )
+)
+calendar_api_calls = registry.register(
+    Counter(
+        "scheduleai_calendar_api_calls_total",
+        "HTTP requests made to the Google Calendar API.",
+        ["method"],
+    )
+)
+websocket_bytes = registry.register(
+    Counter(
+        "scheduleai_websocket_bytes_total",
+        "Payload bytes sent and received over client WebSockets.",
+        ["direction"],
+    )
+)
+session_bytes = registry.register(
+    Gauge(
+        "scheduleai_session_bytes",
+        "Payload bytes sent and received by each connected session.",
+        ["session_id", "direction"],
+    )
+)
+outbound_audio_dropped = registry.register(
+    Counter(
+        "scheduleai_outbound_audio_dropped_bytes_total",
+        "Model audio dropped before reaching a client, by reason (overflow or interrupted).",
+        ["reason"],
+    )
+)
+time_to_first_audio = registry.register(
+    Histogram(
+        "scheduleai_time_to_first_audio_seconds",
+        "Time from accepting a WebSocket to sending it the first audio byte.",
+        ["warm"],
+        buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30),
+    )
+)
+active_websockets = registry.register(
+    Gauge(
+        "scheduleai_active_websockets",
+        "Client WebSocket connections currently open.",
+    )
+)
+sessions_stored = registry.register(
+    Gauge(
+        "scheduleai_sessions",
+        "Sessions held in memory; idle ones have no client connected.",
+        ["state"],
+    )
+)
+sessions_closed = registry.register(
+    Counter(
+        "scheduleai_sessions_closed_total",
+        "Sessions deleted when their client disconnected.",
+    )
+)
+sessions_evicted = registry.register(
+    Counter(
+        "scheduleai_sessions_evicted_total",
+        "Idle sessions evicted without being closed, i.e. leaked by a connection.",
+        ["reason"],
+    )
+)
+
+event_store_reads = registry.register(
+    Counter(
+        "scheduleai_event_store_reads_total",
+        "Event store queries by the age of the data served (fresh, stale or synced).",
+        ["freshness"],
+    )
+)
+
+
+def count_bytes(session_id, direction, size):
+    """Add WebSocket payload bytes to the total and per-session metrics."""
+    websocket_bytes.inc(size, direction=direction)
+    session_bytes.inc(size, session_id=session_id, direction=direction)
@@ -0,0 +1,81 @@
+"""
+Microbenchmark for get_calendar_service.
+
+Compares the cold path (first call in a process), the warm path (every call
+after that) and the previous behaviour of re-reading the token file and
+rebuilding the client on every call.
+
+Run from the repository root:
+    python -m benchmarks.bench_calendar_service
+"""
+import argparse
+import json
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build
+from app.event_manager.tools import utils
+
+
+def write_synthetic_token(path):
+    """Write a token that stays valid for an hour so no network call is made."""
+    expiry = datetime.utcnow() + timedelta(hours=1)
+    path.write_text(
+        json.dumps(
+            {
+                "token": "synthetic-access-token",
+                "refresh_token": "synthetic-refresh-token",
+                "client_id": "benchmark.apps.googleusercontent.com",
+                "client_secret": "benchmark",
+                "token_uri": "https://oauth2.googleapis.com/token",
+                "scopes": utils.SCOPES,
+                "expiry": expiry.isoformat() + "Z",
+            }
+        )
+    )
+
+
+def legacy_get_calendar_service():
+    """The per-call behaviour before the client cache was introduced."""
+    creds = Credentials.from_authorized_user_info(
+        json.loads(utils.TOKEN_PATH.read_text()), utils.SCOPES
+    )
+    return build("calendar", "v3", credentials=creds)
+
+
+def timed(func, iterations):
+    """Return the mean wall time of func in milliseconds."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) * 1000 / iterations
+
+
+def cold_call():
+    utils.reset_calendar_service()
+    return utils.get_calendar_service()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        utils.TOKEN_PATH = Path(tmp) / "calendar_token.json"
+        write_synthetic_token(utils.TOKEN_PATH)
+
+        legacy_ms = timed(legacy_get_calendar_service, args.iterations)
+        cold_ms = timed(cold_call, args.iterations)
+        utils.get_calendar_service()
+        warm_ms = timed(utils.get_calendar_service, args.iterations * 100)
+
+    print(f"legacy (rebuild every call): {legacy_ms:8.3f} ms/call")
+    print(f"cold   (first call):         {cold_ms:8.3f} ms/call")
+    print(f"warm   (cached):             {warm_ms * 1000:8.3f} us/call")
+
+
+if __name__ == "__main__":
+    main()
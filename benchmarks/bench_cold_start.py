@@ -0,0 +1,181 @@
+"""
+Measure server cold start and check it against a budget.
+
+Profiles `import main` with `python -X importtime` and reports where the
+import time goes, by module and by package. Then starts the server in fresh
+processes and times how long until it answers its first request, and how
+long until the agent runtime has loaded in the background.
+
+Exits with status 1 if the median time to the first response is over the
+budget, or if importing main loads any of HEAVY_MODULES, which are meant to
+load only with the agent runtime.
+
+Run from the repository root:
+    python -m benchmarks.bench_cold_start
+    python -m benchmarks.bench_cold_start --budget 1.0 --runs 5 --top 30
+"""
+import argparse
+import collections
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+# Packages the server must not import before it starts answering
+HEAVY_MODULES = ("google.adk", "google.genai", "google.cloud", "googleapiclient", "vertexai")
+
+# Log message written once the agent runtime has loaded, see main.get_runtime
+RUNTIME_LOADED = "agent runtime loaded"
+
+
+def package_of(module):
+    """Group modules by top-level package, keeping one more level for namespace packages."""
+    parts = module.split(".")
+    return ".".join(parts[:2]) if parts[0] == "google" else parts[0]
+
+
+def profile_imports():
+    """
+    Import main in a fresh interpreter with -X importtime.
+
+    Returns:
+        list: (module, self seconds, cumulative seconds) for every imported module
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "LOG_LEVEL": "WARNING"},
+    )
+    if result.returncode != 0:
+        sys.exit(f"import main failed:\n{result.stderr}")
+
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(self_us) / 1e6, int(cumulative_us) / 1e6))
+    return modules
+
+
+def print_profile(modules, top):
+    total = sum(self_seconds for _, self_seconds, _ in modules)
+    print(f"import main: {total * 1000:.0f} ms in {len(modules)} modules")
+
+    by_package = collections.Counter()
+    for name, self_seconds, _ in modules:
+        by_package[package_of(name)] += self_seconds
+    print(f"\n{'package':<48} {'ms':>8} {'share':>6}")
+    for package, seconds in by_package.most_common(top):
+        print(f"{package:<48} {seconds * 1000:>8.1f} {seconds / total:>6.1%}")
+
+    print(f"\n{'module':<48} {'self ms':>8} {'cumulative ms':>14}")
+    for name, self_seconds, cumulative in sorted(modules, key=lambda m: -m[1])[:top]:
+        print(f"{name:<48} {self_seconds * 1000:>8.1f} {cumulative * 1000:>14.1f}")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(timeout):
+    """
+    Start the server in a new process and wait until it answers and the agent has loaded.
+
+    Returns:
+        tuple: Seconds to the first response, and to the agent runtime loading
+        (None if it did not load within the timeout)
+    """
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.PIPE,
+        text=True,
+        env={**os.environ, "LOG_LEVEL": "INFO", "SCHEDULEAI_WARM_POOL_SIZE": "0"},
+    )
+
+    runtime_loaded = threading.Event()
+    loaded_at = []
+
+    def watch_logs():
+        for line in server.stdout:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("msg") == RUNTIME_LOADED:
+                loaded_at.append(time.perf_counter() - started)
+                runtime_loaded.set()
+
+    threading.Thread(target=watch_logs, daemon=True).start()
+
+    try:
+        first_response = None
+        deadline = started + timeout
+        while first_response is None:
+            if server.poll() is not None or time.perf_counter() > deadline:
+                sys.exit("server did not start")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=1):
+                    first_response = time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.005)
+
+        runtime_loaded.wait(max(deadline - time.perf_counter(), 0))
+        return first_response, loaded_at[0] if loaded_at else None
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget", type=float, default=1.5,
+                        help="allowed median seconds from process start to the first response")
+    parser.add_argument("--runs", type=int, default=3, help="server starts to time")
+    parser.add_argument("--top", type=int, default=15, help="packages and modules to list")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    modules = profile_imports()
+    print_profile(modules, args.top)
+
+    print(f"\n{'run':<6} {'first response s':>17} {'agent loaded s':>15}")
+    first_responses = []
+    for run in range(args.runs):
+        first_response, loaded = start_server(args.timeout)
+        first_responses.append(first_response)
+        loaded_text = f"{loaded:.3f}" if loaded is not None else "timeout"
+        print(f"{run + 1:<6} {first_response:>17.3f} {loaded_text:>15}")
+
+    failures = []
+    median = statistics.median(first_responses)
+    if median > args.budget:
+        failures.append(f"median cold start {median:.3f} s is over the {args.budget:.3f} s budget")
+    heavy = sorted({
+        name for name, _, _ in modules
+        if any(name == heavy or name.startswith(heavy + ".") for heavy in HEAVY_MODULES)
+    })
+    if heavy:
+        failures.append(f"import main loads {len(heavy)} heavy modules, e.g. {', '.join(heavy[:5])}")
+
+    for failure in failures:
+        print(f"OVER BUDGET {failure}")
+    if failures:
+        return 1
+    print(f"\nCold start {median:.3f} s is within the {args.budget:.3f} s budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
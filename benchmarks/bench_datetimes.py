@@ -0,0 +1,131 @@
+"""
+Benchmark the datetimes module against the parsers the tools used before it.
+
+Times bulk parsing of API event times (the find_free_time and event store
+path) and of user-supplied times in every accepted format (the create and
+edit path). No Calendar API access is needed.
+
+Run from the repository root:
+    python -m benchmarks.bench_datetimes
+    python -m benchmarks.bench_datetimes --events 100000
+"""
+import argparse
+import datetime
+import random
+import time
+from app.event_manager.tools.datetimes import parse_api_time, parse_user_datetime, to_naive_utc
+
+OFFSETS = ["Z", "+05:30", "-07:00", "+00:00"]
+
+LEGACY_FORMATS = [
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d %I:%M %p",
+    "%Y-%m-%d",
+    "%m/%d/%Y %H:%M",
+    "%m/%d/%Y %I:%M %p",
+    "%m/%d/%Y",
+    "%B %d, %Y %H:%M",
+    "%B %d, %Y %I:%M %p",
+    "%B %d, %Y",
+]
+
+
+def legacy_parse_datetime(datetime_str):
+    """utils.parse_datetime before the datetimes module: try every format in turn."""
+    for fmt in LEGACY_FORMATS:
+        try:
+            return datetime.datetime.strptime(datetime_str, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def legacy_parse_event_datetime(event_time_dict):
+    """find_free_time.parse_event_datetime before the datetimes module."""
+    try:
+        if "dateTime" in event_time_dict:
+            dt_str = event_time_dict["dateTime"]
+            if dt_str.endswith("Z"):
+                dt_str = dt_str.replace("Z", "+00:00")
+            elif "+" not in dt_str and "-" not in dt_str[-6:]:
+                dt_str = dt_str + "+00:00"
+            return datetime.datetime.fromisoformat(dt_str)
+        elif "date" in event_time_dict:
+            date_str = event_time_dict["date"]
+            return datetime.datetime.strptime(date_str, "%Y-%m-%d").replace(tzinfo=datetime.timezone.utc)
+        return None
+    except Exception:
+        return None
+
+
+def api_times(count, seed=3):
+    """Start/end dictionaries as the API returns them, 5% of them all-day."""
+    rng = random.Random(seed)
+    first = datetime.datetime(2025, 1, 1)
+    times = []
+    for _ in range(count):
+        moment = first + datetime.timedelta(minutes=15 * rng.randrange(4 * 24 * 365))
+        if rng.random() < 0.05:
+            times.append({"date": moment.date().isoformat()})
+        else:
+            times.append({"dateTime": moment.isoformat() + rng.choice(OFFSETS)})
+    return times
+
+
+def user_times(count, seed=5):
+    """Times in each accepted input format, in equal shares."""
+    rng = random.Random(seed)
+    first = datetime.datetime(2025, 1, 1)
+    return [
+        (first + datetime.timedelta(minutes=15 * rng.randrange(4 * 24 * 365))).strftime(
+            LEGACY_FORMATS[i % len(LEGACY_FORMATS)]
+        )
+        for i in range(count)
+    ]
+
+
+def best_of(func, values, repeat):
+    """Return the fastest of repeat passes over values, in microseconds per value."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for value in values:
+            func(value)
+        best = min(best, time.perf_counter() - start)
+    return best / len(values) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, default=50000, help="API event times parsed")
+    parser.add_argument("--inputs", type=int, default=9000, help="user-supplied times parsed")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    events = api_times(args.events)
+    inputs = user_times(args.inputs)
+
+    # Both sides parse the same strings to the same instants
+    assert all(
+        to_naive_utc(legacy_parse_event_datetime(value)) == to_naive_utc(parse_api_time(value))
+        for value in events[:1000]
+    )
+    assert all(legacy_parse_datetime(value) == parse_user_datetime(value) for value in inputs[:1000])
+
+    rows = [
+        ("API event times", legacy_parse_event_datetime, parse_api_time, events),
+        ("user input, all formats", legacy_parse_datetime, parse_user_datetime, inputs),
+    ]
+    for name, legacy in ((f"user input, {fmt}", fmt) for fmt in LEGACY_FORMATS):
+        sample = [value for i, value in enumerate(inputs) if LEGACY_FORMATS[i % len(LEGACY_FORMATS)] == legacy]
+        rows.append((name, legacy_parse_datetime, parse_user_datetime, sample))
+
+    print(f"{'':<36} {'legacy us':>10} {'new us':>8} {'speedup':>8}")
+    for name, legacy, new, values in rows:
+        legacy_us = best_of(legacy, values, args.repeat)
+        new_us = best_of(new, values, args.repeat)
+        print(f"{name:<36} {legacy_us:>10.2f} {new_us:>8.2f} {legacy_us / new_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
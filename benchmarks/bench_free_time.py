@@ -0,0 +1,151 @@
+"""
+Benchmark the sweep-line free-time engine against the previous per-day scan.
+
+Both run on synthetic calendars with overlapping meetings, all-day events and
+mixed time zones. No Calendar API access is needed.
+
+Run from the repository root:
+    python -m benchmarks.bench_free_time
+"""
+import argparse
+import datetime
+import random
+import time
+from app.event_manager.tools.event_store import event_bounds
+from app.event_manager.tools.find_free_time import (
+    busy_intervals,
+    compute_free_slots,
+    format_time_for_display,
+)
+
+TIMEZONES = ["Z", "+05:30", "-07:00", "+00:00"]
+
+
+def synthetic_events(first_date, days, count, seed=7):
+    """Generate count events spread over the horizon, some overlapping, ordered by start."""
+    rng = random.Random(seed)
+    events = []
+    for i in range(count):
+        day = first_date + datetime.timedelta(days=rng.randrange(days))
+        if rng.random() < 0.03:
+            events.append({
+                "id": f"e{i}",
+                "summary": f"All day {i}",
+                "start": {"date": day.isoformat()},
+                "end": {"date": (day + datetime.timedelta(days=1)).isoformat()},
+            })
+            continue
+        start = datetime.datetime.combine(day, datetime.time(rng.randrange(24), rng.choice([0, 15, 30, 45])))
+        end = start + datetime.timedelta(minutes=rng.choice([15, 30, 45, 60, 90, 120]))
+        tz = rng.choice(TIMEZONES)
+        events.append({
+            "id": f"e{i}",
+            "summary": f"Meeting {i}",
+            "start": {"dateTime": start.isoformat() + tz},
+            "end": {"dateTime": end.isoformat() + tz},
+        })
+    # The event store hands events over in start order
+    events.sort(key=lambda event: event_bounds(event)[0])
+    return events
+
+
+def legacy_parse_event_datetime(event_time_dict):
+    """The string surgery find_free_time used before the datetimes module."""
+    try:
+        if "dateTime" in event_time_dict:
+            dt_str = event_time_dict["dateTime"]
+            if dt_str.endswith("Z"):
+                dt_str = dt_str.replace("Z", "+00:00")
+            elif "+" not in dt_str and "-" not in dt_str[-6:]:
+                dt_str = dt_str + "+00:00"
+            return datetime.datetime.fromisoformat(dt_str)
+        elif "date" in event_time_dict:
+            date_str = event_time_dict["date"]
+            return datetime.datetime.strptime(date_str, "%Y-%m-%d").replace(tzinfo=datetime.timezone.utc)
+        return None
+    except Exception:
+        return None
+
+
+def legacy_free_slots(events, first_date, days, start_hour, end_hour, min_duration):
+    """The per-day scan find_free_time used before the sweep-line engine."""
+    free_slots = []
+    for day in range(days):
+        day_date = first_date + datetime.timedelta(days=day)
+        window_start = datetime.datetime.combine(day_date, datetime.time(start_hour, 0))
+        if end_hour <= start_hour:
+            next_day = day_date + datetime.timedelta(days=1)
+            window_end = datetime.datetime.combine(next_day, datetime.time(end_hour, 0))
+        else:
+            window_end = datetime.datetime.combine(day_date, datetime.time(end_hour, 0))
+
+        window_events = []
+        for event in events:
+            start_dt = legacy_parse_event_datetime(event.get("start", {}))
+            end_dt = legacy_parse_event_datetime(event.get("end", {}))
+            if start_dt and end_dt:
+                start_utc = start_dt.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+                end_utc = end_dt.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+                if start_utc < window_end and end_utc > window_start:
+                    window_events.append({"start": start_dt, "end": end_dt, "start_utc": start_utc, "end_utc": end_utc})
+        window_events.sort(key=lambda x: x["start_utc"])
+
+        boundaries = [(window_start, window_start)]
+        for event in window_events:
+            boundaries.append((event["start_utc"], event["start"]))
+            boundaries.append((event["end_utc"], event["end"]))
+        boundaries.append((window_end, window_end))
+
+        # Gaps are only compared with the previous event's end
+        for (gap_start_utc, gap_start), (gap_end_utc, gap_end) in zip(boundaries[::2], boundaries[1::2]):
+            if gap_start_utc < gap_end_utc:
+                duration_minutes = int((gap_end_utc - gap_start_utc).total_seconds() / 60)
+                if duration_minutes >= min_duration:
+                    free_slots.append({
+                        "date": day_date.strftime("%Y-%m-%d"),
+                        "start_time": format_time_for_display(gap_start),
+                        "end_time": format_time_for_display(gap_end),
+                        "duration_minutes": duration_minutes,
+                    })
+    return free_slots
+
+
+def sweep_free_slots(events, first_date, days, start_hour, end_hour, min_duration):
+    # The event store parses each event once when it is synced; that is timed here too
+    entries = [(*event_bounds(event), event) for event in events]
+    return compute_free_slots(
+        busy_intervals(entries), first_date, days, start_hour, end_hour, min_duration
+    )
+
+
+def best_of(func, repeat, *args):
+    """Return the fastest of repeat runs in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-legacy", action="store_true", help="only time the sweep-line engine")
+    args = parser.parse_args()
+
+    first_date = datetime.date(2025, 1, 1)
+    print(f"{'days':>5} {'events':>7} {'legacy ms':>11} {'sweep ms':>10} {'speedup':>8}")
+    for days, count in [(30, 1000), (90, 3000), (180, 5000), (365, 10000)]:
+        events = synthetic_events(first_date, days, count)
+        params = (events, first_date, days, 9, 2, 30)
+        sweep_ms = best_of(sweep_free_slots, args.repeat, *params)
+        if args.skip_legacy:
+            print(f"{days:>5} {count:>7} {'-':>11} {sweep_ms:>10.2f} {'-':>8}")
+            continue
+        legacy_ms = best_of(legacy_free_slots, 1, *params)
+        print(f"{days:>5} {count:>7} {legacy_ms:>11.1f} {sweep_ms:>10.2f} {legacy_ms / sweep_ms:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark the session services: append and load latency, in memory vs SQLite.
+
+Compares BoundedSessionService with SqliteSessionService, both with
+write-behind batching (the default) and writing every event at once.
+Appends are timed as the caller sees them, and the append throughput
+includes the final flush, so write-behind does not hide its disk time.
+
+Run from the repository root:
+    python -m benchmarks.bench_sessions
+    python -m benchmarks.bench_sessions --events 5000
+"""
+import argparse
+import os
+import tempfile
+import time
+from google.adk.events.event import Event, EventActions
+from google.genai import types
+from app.sessions import BoundedSessionService, SqliteSessionService
+
+APP_NAME = "bench"
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def make_event(i):
+    """A transcription-sized turn, with a state change every tenth event."""
+    actions = EventActions(state_delta={"turns": i}) if i % 10 == 0 else EventActions()
+    return Event(
+        author="user" if i % 2 else "event_manager",
+        content=types.Content(
+            role="user" if i % 2 else "model",
+            parts=[types.Part(text=f"Turn {i}: move the design review to Thursday at three " * 3)],
+        ),
+        actions=actions,
+    )
+
+
+def bench_service(name, service, events, loads):
+    session = service.create_session(app_name=APP_NAME, user_id="user", session_id="appends")
+    prepared = [make_event(i) for i in range(events)]
+
+    latencies = []
+    start = time.perf_counter()
+    for event in prepared:
+        begin = time.perf_counter()
+        service.append_event(session, event)
+        latencies.append((time.perf_counter() - begin) * 1e6)
+    if hasattr(service, "flush"):
+        service.flush()
+    total = time.perf_counter() - start
+
+    print(
+        f"{name:<22} append p50 {percentile(latencies, 0.5):>8.1f} us  "
+        f"p99 {percentile(latencies, 0.99):>8.1f} us  "
+        f"throughput {events / total:>9.0f} events/s"
+    )
+
+    for size in loads:
+        session_id = f"load-{size}"
+        session = service.create_session(app_name=APP_NAME, user_id="user", session_id=session_id)
+        for event in prepared[:size]:
+            service.append_event(session, event)
+        timings = []
+        for _ in range(20):
+            begin = time.perf_counter()
+            loaded = service.get_session(app_name=APP_NAME, user_id="user", session_id=session_id)
+            timings.append((time.perf_counter() - begin) * 1000)
+        assert len(loaded.events) == size
+        print(f"{'':<22} load {size:>5} events p50 {percentile(timings, 0.5):>8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, default=2000, help="events appended in the append test")
+    parser.add_argument("--loads", type=int, nargs="+", default=[10, 100, 1000],
+                        help="session sizes for the load test")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        services = [
+            ("memory", BoundedSessionService()),
+            ("sqlite write-behind", SqliteSessionService(os.path.join(directory, "behind.db"))),
+            ("sqlite write-through", SqliteSessionService(os.path.join(directory, "through.db"), flush_interval=0)),
+        ]
+        for name, service in services:
+            bench_service(name, service, args.events, args.loads)
+            if hasattr(service, "close"):
+                service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""
+Offline benchmark suite for the Calendar tools.
+
+Runs list_event, find_free_time, suggest_slots, create_event, edit_event and delete_event
+against the in-process FakeCalendarService, seeded with synthetic calendars
+from 10 to 50k events. For every scenario it reports latency percentiles,
+memory allocated per call and Calendar API calls per call, and compares them
+with the stored baseline.
+
+Run from the repository root:
+    python -m benchmarks.bench_tools                    # compare with baseline
+    python -m benchmarks.bench_tools --save-baseline    # record a new baseline
+
+Exits with status 1 if any scenario makes more API calls than the baseline,
+or allocates more memory past the tolerance. Both are deterministic. Timings
+vary with machine load, so a p50 over the limit is only reported, unless
+--fail-on-timing is given.
+"""
+import argparse
+import datetime
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from app.event_manager.tools import event_store, utils
+from app.event_manager.tools.calendar_metadata import calendar_metadata
+from app.event_manager.tools.create_event import create_event
+from app.event_manager.tools.delete_event import delete_event
+from app.event_manager.tools.edit_event import edit_event
+from app.event_manager.tools.find_free_time import find_free_time
+from app.event_manager.tools.list_event import list_event
+from app.event_manager.tools.suggest_slots import suggest_slots
+from .fake_calendar import FakeCalendarService, seed_calendar
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+SIZES = [10, 1000, 10000, 50000]
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+class Scenario:
+    """
+    One tool call pattern to measure.
+
+    Args:
+        name (str): Scenario name, used as the baseline key with the calendar size
+        call (callable): Runs one tool call, given the iteration number
+        setup (callable): Runs before every call, outside the measurement
+        cold (bool): Drop the event store and metadata cache before every call
+    """
+
+    def __init__(self, name, call, setup=None, cold=False):
+        self.name = name
+        self.call = call
+        self.setup = setup
+        self.cold = cold
+
+    def run(self, service, iterations):
+        latencies, allocations, api_calls = [], [], []
+        for i in range(iterations):
+            self._prepare(i)
+            service.reset_counters()
+            start = time.perf_counter()
+            result = self.call(i)
+            latencies.append((time.perf_counter() - start) * 1000)
+            api_calls.append(sum(service.calls.values()))
+            if result.get("status") != "success":
+                raise RuntimeError(f"{self.name} failed: {result.get('message')}")
+
+        # Allocations are measured in a separate pass, tracing slows the calls down
+        for i in range(min(iterations, 5)):
+            self._prepare(iterations + i)
+            tracemalloc.start()
+            self.call(iterations + i)
+            allocations.append(tracemalloc.get_traced_memory()[1] / 1024)
+            tracemalloc.stop()
+
+        return {
+            "p50_ms": round(percentile(latencies, 0.50), 3),
+            "p95_ms": round(percentile(latencies, 0.95), 3),
+            "p99_ms": round(percentile(latencies, 0.99), 3),
+            "peak_kib": round(statistics.median(allocations), 1),
+            "api_calls": round(statistics.mean(api_calls), 2),
+        }
+
+    def _prepare(self, i):
+        if self.cold:
+            event_store.reset_event_stores()
+            calendar_metadata.clear()
+        if self.setup:
+            self.setup(i)
+
+
+def build_scenarios(service, today):
+    """Create the scenarios for one seeded calendar."""
+    created = []
+
+    def create(i):
+        start = datetime.datetime.combine(today, datetime.time(10)) + datetime.timedelta(days=i % 60)
+        result = create_event(
+            f"Benchmark {i}",
+            start.strftime("%Y-%m-%d %H:%M"),
+            (start + datetime.timedelta(minutes=30)).strftime("%Y-%m-%d %H:%M"),
+        )
+        created.append(result.get("event_id"))
+        return result
+
+    def ensure_created(i):
+        if not created:
+            create(i)
+
+    def edit(i):
+        return edit_event(created[i % len(created)], f"Renamed {i}", "", "")
+
+    def delete_setup(i):
+        create(i)
+
+    def delete(i):
+        return delete_event(created.pop(), True)
+
+    def external_change(i):
+        # Another client adds an event, and the store is due for a sync
+        service.add_event("primary", {
+            "summary": f"External {i}",
+            "start": {"dateTime": f"{today.isoformat()}T08:00:00Z"},
+            "end": {"dateTime": f"{today.isoformat()}T08:30:00Z"},
+        })
+        event_store.get_event_store("primary")._last_sync = 0.0
+
+    start_date = today.strftime("%Y-%m-%d")
+    return [
+        Scenario("list_event 7d cold", lambda i: list_event(start_date, 7), cold=True),
+        Scenario("list_event 7d warm", lambda i: list_event(start_date, 7)),
+        Scenario("list_event 7d delta", lambda i: list_event(start_date, 7), setup=external_change),
+        Scenario("find_free_time 30d warm", lambda i: find_free_time(start_date, 30)),
+        Scenario("suggest_slots 30d warm", lambda i: suggest_slots(60, start_date, 30)),
+        # Cold runs leave the stores empty, so they come after every warm scenario
+        Scenario("find_free_time 30d cold", lambda i: find_free_time(start_date, 30), cold=True),
+        Scenario("create_event", create),
+        Scenario("edit_event", edit, setup=ensure_created),
+        Scenario("delete_event", delete, setup=delete_setup),
+    ]
+
+
+def run_suite(sizes, iterations):
+    results = {}
+    today = datetime.date.today()
+    # Long cold scenarios age the stores past SYNC_INTERVAL; without this the
+    # warm scenarios would time reads alongside background syncs. The delta
+    # scenario still forces its sync.
+    event_store.SYNC_INTERVAL = event_store.STALE_WINDOW
+    for size in sizes:
+        service = seed_calendar(FakeCalendarService(), size)
+        utils.override_calendar_service(service)
+        event_store.reset_event_stores()
+        calendar_metadata.clear()
+
+        # Cold scenarios re-sync the whole calendar, keep them short on big ones
+        for scenario in build_scenarios(service, today):
+            runs = max(3, iterations // 10) if scenario.cold and size > 1000 else iterations
+            key = f"{scenario.name} [{size}]"
+            results[key] = scenario.run(service, runs)
+            print_row(key, results[key])
+    utils.override_calendar_service(None)
+    return results
+
+
+def print_row(key, result):
+    print(
+        f"{key:<36} p50 {result['p50_ms']:>9.3f} ms  p95 {result['p95_ms']:>9.3f} ms  "
+        f"p99 {result['p99_ms']:>9.3f} ms  peak {result['peak_kib']:>9.1f} KiB  "
+        f"api {result['api_calls']:>5.2f}",
+        flush=True,
+    )
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare results with the baseline.
+
+    Returns:
+        tuple: Regressions in API calls and memory, and p50 timings over the limit
+    """
+    regressions, slower = [], []
+    for key, result in results.items():
+        expected = baseline.get(key)
+        if not expected:
+            continue
+        # Sub-millisecond timings are too noisy for a relative limit
+        limit = max(expected["p50_ms"] * (1 + tolerance), expected["p50_ms"] + 1.0)
+        if result["p50_ms"] > limit:
+            slower.append(f"{key}: p50 {result['p50_ms']} ms > {limit:.3f} ms")
+        if result["api_calls"] > expected["api_calls"]:
+            regressions.append(
+                f"{key}: {result['api_calls']} API calls > {expected['api_calls']}"
+            )
+        if result["peak_kib"] > expected["peak_kib"] * (1 + tolerance) + 16:
+            regressions.append(
+                f"{key}: peak {result['peak_kib']} KiB > {expected['peak_kib']} KiB"
+            )
+    return regressions, slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="allowed slowdown over the baseline p50 and peak memory, e.g. 0.5 for 50%%")
+    parser.add_argument("--fail-on-timing", action="store_true",
+                        help="also fail when a p50 is over the limit, for quiet machines")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    results = run_suite(args.sizes, args.iterations)
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps({
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": results,
+        }, indent=2) + "\n")
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}, run with --save-baseline first")
+        return 0
+
+    regressions, slower = compare(
+        results, json.loads(args.baseline.read_text())["results"], args.tolerance
+    )
+    if args.fail_on_timing:
+        regressions += slower
+    else:
+        for timing in slower:
+            print(f"SLOWER {timing}")
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        return 1
+    print("No regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Check that free time is the same whether it comes from freebusy or the event store.
+
+find_free_time and suggest_slots ask freebusy().query for busy time while the
+local copy of a calendar does not cover the range, and read the event store
+once it does. Both must agree, including for events shown as available,
+events the user declined and all-day events, in calendars on either side of
+UTC. Runs against the in-process FakeCalendarService.
+
+Exits with status 1 if any result differs between the two paths.
+
+Run from the repository root:
+    python -m benchmarks.check_busy_paths
+"""
+import argparse
+import datetime
+import sys
+import zoneinfo
+from app.event_manager.tools import event_store, utils
+from app.event_manager.tools.calendar_metadata import calendar_metadata
+from app.event_manager.tools.find_free_time import find_free_time
+from app.event_manager.tools.list_event import list_event
+from app.event_manager.tools.suggest_slots import suggest_slots
+from .fake_calendar import FakeCalendarService, seed_calendar
+
+TIMEZONES = ["Asia/Kolkata", "UTC", "America/Los_Angeles"]
+
+
+def add_edge_cases(service, day, timezone_id):
+    """Events that show as available or were declined, next to ones that block time."""
+    zone = zoneinfo.ZoneInfo(timezone_id)
+
+    def at(hour, minute=0):
+        moment = datetime.datetime.combine(day, datetime.time(hour, minute), zone)
+        return {"dateTime": moment.isoformat(), "timeZone": timezone_id}
+
+    myself = {"email": "me@example.com", "self": True}
+    for summary, start, end, extra in [
+        ("Working from home", {"date": day.isoformat()},
+         {"date": (day + datetime.timedelta(days=1)).isoformat()}, {"transparency": "transparent"}),
+        ("Planning", at(10), at(11), {}),
+        ("Declined review", at(13), at(14), {"attendees": [{**myself, "responseStatus": "declined"}]}),
+        ("Accepted review", at(15), at(16), {"attendees": [{**myself, "responseStatus": "accepted"}]}),
+        ("Focus time", at(16, 30), at(18), {"transparency": "transparent"}),
+    ]:
+        service.add_event("primary", {"summary": summary, "start": start, "end": end, **extra})
+
+
+def run_both_paths(service, call):
+    """Run call once through freebusy and once from a warmed event store."""
+    event_store.reset_event_stores()
+    calendar_metadata.clear()
+    service.reset_counters()
+    from_freebusy = call()
+    used_freebusy = service.calls["calendar.freebusy.query"] > 0
+
+    # list_event syncs the store, after which the range is read locally
+    list_event(datetime.date.today().isoformat(), 1)
+    service.reset_counters()
+    from_store = call()
+    used_store = service.calls["calendar.freebusy.query"] == 0
+    return from_freebusy, from_store, used_freebusy and used_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, default=500, help="synthetic events per calendar")
+    parser.add_argument("--days", type=int, default=14, help="days searched")
+    args = parser.parse_args()
+
+    today = datetime.date.today()
+    start_date = today.isoformat()
+    checks = {
+        "find_free_time": lambda: find_free_time(start_date, args.days)["free_slots"],
+        "find_free_time 9-17": lambda: find_free_time(start_date, args.days, 9, 17, 15)["free_slots"],
+        "suggest_slots": lambda: suggest_slots(60, start_date, args.days, k=10)["slots"],
+        "suggest_slots no buffer": lambda: suggest_slots(30, start_date, args.days, buffer_minutes=0, k=10)["slots"],
+    }
+
+    failures = []
+    for timezone_id in TIMEZONES:
+        service = seed_calendar(FakeCalendarService(timezone=timezone_id), args.events)
+        for day in range(1, args.days, 3):
+            add_edge_cases(service, today + datetime.timedelta(days=day), timezone_id)
+        utils.override_calendar_service(service)
+
+        for name, call in checks.items():
+            from_freebusy, from_store, paths_taken = run_both_paths(service, call)
+            same = from_freebusy == from_store
+            print(f"{timezone_id:<22} {name:<26} {len(from_freebusy):>4} slots  "
+                  f"{'same' if same else 'DIFFERENT'}")
+            if not paths_taken:
+                failures.append(f"{timezone_id} {name}: did not take both paths")
+            elif not same:
+                failures.append(f"{timezone_id} {name}: freebusy and the event store disagree")
+    utils.override_calendar_service(None)
+
+    for failure in failures:
+        print(f"MISMATCH {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
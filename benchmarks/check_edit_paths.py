@@ -0,0 +1,97 @@
+"""
+Check that edits through edit_event and batch_events leave valid events behind.
+
+Both tools send only the changed fields with events().patch, which merges
+nested objects such as start and end into the stored event. Moving an
+all-day event to a specific time must therefore clear its date, or the API
+rejects the event for having both a date and a dateTime. Each case is run
+through both tools, for events that are and are not in the event store,
+against the in-process FakeCalendarService, whose patch merges the same way.
+
+Exits with status 1 if any edit fails or leaves the wrong times behind.
+
+Run from the repository root:
+    python -m benchmarks.check_edit_paths
+"""
+import datetime
+import sys
+from app.event_manager.tools import event_store, utils
+from app.event_manager.tools.batch_events import batch_events
+from app.event_manager.tools.calendar_metadata import calendar_metadata
+from app.event_manager.tools.edit_event import edit_event
+from app.event_manager.tools.list_event import list_event
+from .fake_calendar import FakeCalendarService
+
+
+def all_day(day):
+    return {
+        "summary": "Offsite",
+        "start": {"date": day.isoformat()},
+        "end": {"date": (day + datetime.timedelta(days=1)).isoformat()},
+    }
+
+
+def timed(day):
+    start = datetime.datetime.combine(day, datetime.time(9))
+    return {
+        "summary": "Standup",
+        "start": {"dateTime": start.isoformat() + "Z", "timeZone": "UTC"},
+        "end": {"dateTime": (start + datetime.timedelta(minutes=30)).isoformat() + "Z", "timeZone": "UTC"},
+    }
+
+
+def edit_with_edit_event(event_id, summary, start_time, end_time):
+    return edit_event(event_id, summary, start_time, end_time)["status"]
+
+
+def edit_with_batch_events(event_id, summary, start_time, end_time):
+    operation = {
+        "action": "edit",
+        "event_id": event_id,
+        "summary": summary,
+        "start_time": start_time,
+        "end_time": end_time,
+    }
+    return batch_events([operation], confirm=False)["status"]
+
+
+def main():
+    day = datetime.date.today() + datetime.timedelta(days=1)
+    new_start, new_end = f"{day} 14:00", f"{day} 15:00"
+    cases = [
+        # (name, event, summary, start_time, end_time, expected start keys)
+        ("all-day to timed", all_day(day), "", new_start, new_end, {"dateTime", "timeZone"}),
+        ("timed to timed", timed(day), "", new_start, new_end, {"dateTime", "timeZone"}),
+        ("all-day rename", all_day(day), "Team offsite", "", "", {"date"}),
+    ]
+    tools = {"edit_event": edit_with_edit_event, "batch_events": edit_with_batch_events}
+
+    failures = []
+    for tool_name, edit in tools.items():
+        for cached in (False, True):
+            for name, event, summary, start_time, end_time, expected in cases:
+                service = FakeCalendarService(timezone="UTC")
+                utils.override_calendar_service(service)
+                event_store.reset_event_stores()
+                calendar_metadata.clear()
+                event = service.add_event("primary", event)
+                if cached:
+                    list_event(day.isoformat(), 1)
+
+                status = edit(event["id"], summary, start_time, end_time)
+                stored = service.calendar("primary").events[event["id"]]
+                keys = {key for key in ("date", "dateTime", "timeZone") if key in stored["start"]}
+                ok = status == "success" and keys == expected and set(stored["end"]) == keys
+                label = f"{tool_name:<13} {'cached' if cached else 'uncached':<9} {name}"
+                print(f"{label:<44} {status:<8} {'ok' if ok else 'WRONG'}")
+                if not ok:
+                    failures.append(f"{label}: {status}, start {stored['start']}, end {stored['end']}")
+    utils.override_calendar_service(None)
+
+    for failure in failures:
+        print(f"FAILED {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,428 @@
+"""
+In-process stand-in for the Google Calendar v3 service object.
+
+It implements the parts of the API the tools use: events list/get/insert/
+patch/update/delete with paging, sync tokens and ETag preconditions,
+freebusy queries, settings, the calendar list and batch requests. Responses go through a JSON
+round trip, like real HTTP responses do, and every call is counted by method.
+"""
+import bisect
+import collections
+import datetime
+import itertools
+import json
+import random
+import time
+import zoneinfo
+import httplib2
+from googleapiclient.errors import HttpError
+
+TIMEZONES = [("Asia/Kolkata", "+05:30"), ("UTC", "Z"), ("America/Los_Angeles", "-07:00")]
+
+
+def _http_error(status, message):
+    return HttpError(httplib2.Response({"status": status}), message.encode())
+
+
+def _parse(value):
+    return datetime.datetime.fromisoformat(value).astimezone(datetime.timezone.utc)
+
+
+def _blocks_time(event):
+    """Whether freebusy counts an event: not shown as available, not declined by the user."""
+    return event.get("transparency") != "transparent" and not any(
+        attendee.get("self") and attendee.get("responseStatus") == "declined"
+        for attendee in event.get("attendees", ())
+    )
+
+
+def _bounds(event, timezone="UTC"):
+    start, end = event["start"], event["end"]
+    if "dateTime" in start:
+        return _parse(start["dateTime"]), _parse(end["dateTime"])
+    # All-day events start at midnight in the calendar's timezone
+    zone = zoneinfo.ZoneInfo(timezone)
+    start_dt = datetime.datetime.fromisoformat(start["date"]).replace(tzinfo=zone)
+    end_dt = datetime.datetime.fromisoformat(end["date"]).replace(tzinfo=zone)
+    return start_dt.astimezone(datetime.timezone.utc), end_dt.astimezone(datetime.timezone.utc)
+
+
+def _merge_patch(event, body):
+    """Apply a patch body the way the API does: nested objects merge, null removes a field."""
+    merged = dict(event)
+    for key, value in body.items():
+        if value is None:
+            merged.pop(key, None)
+        elif isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge_patch(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def _check_times(event):
+    """Reject start or end times with both or neither of date and dateTime, like the API."""
+    for field in ("start", "end"):
+        time_value = event.get(field, {})
+        if ("date" in time_value) == ("dateTime" in time_value):
+            raise _http_error(400, f"Invalid {field} time")
+
+
+class FakeRequest:
+    """A prepared call, executed later like googleapiclient's HttpRequest."""
+
+    def __init__(self, service, method, handler, **params):
+        self.service = service
+        self.methodId = method
+        self.handler = handler
+        self.params = params
+        self.headers = {}
+
+    def execute(self, http=None, num_retries=0):
+        self.service.calls[self.methodId] += 1
+        if self.service.latency:
+            time.sleep(self.service.latency)
+        return self.run()
+
+    def run(self):
+        result = self.handler(headers=self.headers, **self.params)
+        if self.service.json_round_trip:
+            payload = json.dumps(result)
+            self.service.bytes_received += len(payload)
+            result = json.loads(payload)
+        return result
+
+
+class FakeBatch:
+    """Collects requests and runs them as one counted batch call."""
+
+    def __init__(self, service, callback):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id=None, callback=None):
+        self.requests.append((request_id or str(len(self.requests)), request, callback))
+
+    def execute(self, http=None):
+        self.service.calls["batch"] += 1
+        for request_id, request, callback in self.requests:
+            callback = callback or self.callback
+            try:
+                response = request.run()
+            except HttpError as e:
+                callback(request_id, None, e)
+            else:
+                callback(request_id, response, None)
+
+
+class _Resource:
+    """Groups the methods of one API collection, e.g. service.events()."""
+
+    def __init__(self, service, name, methods):
+        for method_name, handler in methods.items():
+            setattr(self, method_name, self._bind(service, f"calendar.{name}.{method_name}", handler))
+
+    @staticmethod
+    def _bind(service, method, handler):
+        def prepare(**params):
+            return FakeRequest(service, method, handler, **params)
+
+        return prepare
+
+
+class FakeCalendar:
+    """Events of one calendar, with a change log for sync tokens."""
+
+    def __init__(self, calendar_id, timezone):
+        self.calendar_id = calendar_id
+        self.timezone = timezone
+        self.events = {}
+        self.versions = {}
+        self.version = 0
+        self._sorted = None
+        self._free = None
+
+    def save(self, event):
+        self.version += 1
+        event["etag"] = f'"{self.version}"'
+        event["updated"] = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        self.events[event["id"]] = event
+        self.versions[event["id"]] = self.version
+        self._sorted = None
+        self._free = None
+
+    def active_by_start(self):
+        """Active events as a list of (start, end, id), sorted by start."""
+        if self._sorted is None:
+            self._sorted = sorted(
+                (*_bounds(event, self.timezone), event_id)
+                for event_id, event in self.events.items()
+                if event.get("status") != "cancelled"
+            )
+        return self._sorted
+
+    def free_ids(self):
+        """IDs of the events freebusy leaves out, worked out once per change."""
+        if self._free is None:
+            self._free = {
+                event_id for event_id, event in self.events.items() if not _blocks_time(event)
+            }
+        return self._free
+
+
+class FakeCalendarService:
+    """
+    Stand-in for the object returned by get_calendar_service().
+
+    Args:
+        timezone (str): Timezone reported by settings and the calendar list
+        json_round_trip (bool): Serialise and parse every response like HTTP does
+        page_size_limit (int): Largest page returned, whatever maxResults asks for
+        latency (float): Seconds every executed call sleeps, like a network round trip
+    """
+
+    def __init__(self, timezone="Asia/Kolkata", json_round_trip=True, page_size_limit=2500, latency=0.0):
+        self.timezone = timezone
+        self.json_round_trip = json_round_trip
+        self.page_size_limit = page_size_limit
+        self.latency = latency
+        self.calls = collections.Counter()
+        self.bytes_received = 0
+        self.calendars = {"primary": FakeCalendar("user@example.com", timezone)}
+        self._ids = itertools.count(1)
+
+    # Collections
+
+    def events(self):
+        return _Resource(
+            self,
+            "events",
+            {
+                "list": self._events_list,
+                "get": self._events_get,
+                "insert": self._events_insert,
+                "patch": self._events_patch,
+                "update": self._events_update,
+                "delete": self._events_delete,
+            },
+        )
+
+    def freebusy(self):
+        return _Resource(self, "freebusy", {"query": self._freebusy_query})
+
+    def settings(self):
+        return _Resource(self, "settings", {"list": self._settings_list, "get": self._settings_get})
+
+    def calendarList(self):
+        return _Resource(self, "calendarList", {"list": self._calendar_list})
+
+    def new_batch_http_request(self, callback=None):
+        return FakeBatch(self, callback)
+
+    # Helpers
+
+    def calendar(self, calendar_id):
+        if calendar_id not in self.calendars:
+            self.calendars[calendar_id] = FakeCalendar(calendar_id, self.timezone)
+        return self.calendars[calendar_id]
+
+    def add_event(self, calendar_id, event):
+        """Store an event directly, without counting an API call."""
+        event = dict(event)
+        event.setdefault("id", f"evt{next(self._ids)}")
+        event.setdefault("status", "confirmed")
+        event.setdefault("htmlLink", f"https://calendar.example.com/event?eid={event['id']}")
+        self.calendar(calendar_id).save(event)
+        return event
+
+    def reset_counters(self):
+        self.calls.clear()
+        self.bytes_received = 0
+
+    # Handlers
+
+    def _events_list(self, headers, calendarId, maxResults=250, pageToken=None,
+                     syncToken=None, timeMin=None, timeMax=None, **params):
+        calendar = self.calendar(calendarId)
+        page_size = min(maxResults, self.page_size_limit)
+        offset = int(pageToken or 0)
+
+        if syncToken is not None:
+            since = int(syncToken)
+            if since > calendar.version:
+                raise _http_error(410, "Sync token is no longer valid")
+            changed = [
+                calendar.events[event_id]
+                for event_id, version in calendar.versions.items()
+                if version > since
+            ]
+        else:
+            ordered = calendar.active_by_start()
+            if timeMax is not None:
+                ordered = ordered[:bisect.bisect_left(ordered, (_parse(timeMax),))]
+            if timeMin is not None:
+                time_min = _parse(timeMin)
+                ordered = [entry for entry in ordered if entry[1] > time_min]
+            changed = [calendar.events[event_id] for _, _, event_id in ordered]
+
+        page = changed[offset:offset + page_size]
+        result = {"kind": "calendar#events", "timeZone": calendar.timezone, "items": page}
+        if offset + page_size < len(changed):
+            result["nextPageToken"] = str(offset + page_size)
+        else:
+            result["nextSyncToken"] = str(calendar.version)
+        return result
+
+    def _find(self, calendarId, eventId):
+        event = self.calendar(calendarId).events.get(eventId)
+        if event is None or event.get("status") == "cancelled":
+            raise _http_error(404, "Not Found")
+        return event
+
+    def _check_etag(self, headers, event):
+        expected = headers.get("If-Match")
+        if expected and expected != event["etag"]:
+            raise _http_error(412, "Precondition Failed")
+
+    def _events_get(self, headers, calendarId, eventId, **params):
+        return self._find(calendarId, eventId)
+
+    def _events_insert(self, headers, calendarId, body, **params):
+        _check_times(body)
+        return self.add_event(calendarId, body)
+
+    def _events_patch(self, headers, calendarId, eventId, body, **params):
+        event = self._find(calendarId, eventId)
+        self._check_etag(headers, event)
+        event = _merge_patch(event, body)
+        _check_times(event)
+        self.calendar(calendarId).save(event)
+        return event
+
+    def _events_update(self, headers, calendarId, eventId, body, **params):
+        event = self._find(calendarId, eventId)
+        self._check_etag(headers, event)
+        event = {**body, "id": eventId, "htmlLink": event["htmlLink"], "status": "confirmed"}
+        _check_times(event)
+        self.calendar(calendarId).save(event)
+        return event
+
+    def _events_delete(self, headers, calendarId, eventId, **params):
+        event = self._find(calendarId, eventId)
+        self.calendar(calendarId).save({"id": eventId, "status": "cancelled", "start": event["start"], "end": event["end"]})
+        return ""
+
+    def _freebusy_query(self, headers, body, **params):
+        time_min, time_max = _parse(body["timeMin"]), _parse(body["timeMax"])
+        timezone = zoneinfo.ZoneInfo(body.get("timeZone", "UTC"))
+        calendars = {}
+        for item in body.get("items", []):
+            if item["id"] not in self.calendars:
+                calendars[item["id"]] = {"errors": [{"domain": "global", "reason": "notFound"}], "busy": []}
+                continue
+            calendar = self.calendars[item["id"]]
+            merged = []
+            free = calendar.free_ids()
+            for start, end, event_id in calendar.active_by_start():
+                if start >= time_max:
+                    break
+                if end <= time_min or event_id in free:
+                    continue
+                start, end = max(start, time_min), min(end, time_max)
+                if merged and start <= merged[-1][1]:
+                    merged[-1][1] = max(merged[-1][1], end)
+                else:
+                    merged.append([start, end])
+            calendars[item["id"]] = {"busy": [
+                {"start": start.astimezone(timezone).isoformat(), "end": end.astimezone(timezone).isoformat()}
+                for start, end in merged
+            ]}
+        return {"kind": "calendar#freeBusy", "timeMin": body["timeMin"], "timeMax": body["timeMax"],
+                "calendars": calendars}
+
+    def _settings_list(self, headers, **params):
+        return {"items": [{"id": "timezone", "value": self.timezone}]}
+
+    def _settings_get(self, headers, setting, **params):
+        if setting != "timezone":
+            raise _http_error(404, "Not Found")
+        return {"id": "timezone", "value": self.timezone}
+
+    def _calendar_list(self, headers, **params):
+        items = []
+        for calendar_id, calendar in self.calendars.items():
+            items.append({
+                "id": calendar.calendar_id,
+                "summary": calendar.calendar_id,
+                "timeZone": calendar.timezone,
+                "primary": calendar_id == "primary",
+                "accessRole": "owner",
+                "defaultReminders": [{"method": "popup", "minutes": 10}],
+            })
+        return {"items": items}
+
+
+def seed_calendar(service, count, calendar_id="primary", start=None, days=120, seed=1):
+    """
+    Fill a calendar with count synthetic events around start.
+
+    About 75% are one-off meetings in mixed time zones, 20% are instances of
+    weekly recurring series (as singleEvents=True returns them) and 5% are
+    all-day events. Some meetings overlap, and most carry a description and
+    attendees so payloads look like a real calendar.
+
+    Args:
+        service (FakeCalendarService): The service to seed
+        count (int): Number of events to create
+        calendar_id (str): Calendar to put them in
+        start (date): First day of the seeded range, defaults to 30 days ago
+        days (int): Number of days the events are spread over
+        seed (int): Random seed, so runs are repeatable
+    """
+    rng = random.Random(seed)
+    if start is None:
+        start = datetime.date.today() - datetime.timedelta(days=30)
+
+    def timed_event(day, hour, minute, duration, summary, **extra):
+        timezone_id, offset = rng.choice(TIMEZONES)
+        start_dt = datetime.datetime.combine(day, datetime.time(hour, minute))
+        end_dt = start_dt + datetime.timedelta(minutes=duration)
+        return {
+            "summary": summary,
+            "description": "Agenda: " + " ".join(rng.choice(["review", "sync", "plan", "demo", "notes"]) for _ in range(12)),
+            "location": rng.choice(["", "Room 4", "https://meet.example.com/abc-defg-hij"]),
+            "attendees": [{"email": f"person{rng.randrange(500)}@example.com"} for _ in range(rng.randrange(6))],
+            "start": {"dateTime": start_dt.isoformat() + offset, "timeZone": timezone_id},
+            "end": {"dateTime": end_dt.isoformat() + offset, "timeZone": timezone_id},
+            **extra,
+        }
+
+    created = 0
+    while created < count:
+        kind = rng.random()
+        day = start + datetime.timedelta(days=rng.randrange(days))
+        if kind < 0.05:
+            service.add_event(calendar_id, {
+                "summary": "Out of office",
+                "start": {"date": day.isoformat()},
+                "end": {"date": (day + datetime.timedelta(days=1)).isoformat()},
+            })
+            created += 1
+        elif kind < 0.25:
+            series_id = f"series{created}"
+            hour, minute = rng.randrange(8, 18), rng.choice([0, 30])
+            for week in range(min(rng.randrange(4, 16), count - created)):
+                instance_day = day + datetime.timedelta(weeks=week)
+                service.add_event(calendar_id, timed_event(
+                    instance_day, hour, minute, 30, "Weekly sync",
+                    id=f"{series_id}_{instance_day:%Y%m%d}", recurringEventId=series_id,
+                ))
+                created += 1
+        else:
+            service.add_event(calendar_id, timed_event(
+                day, rng.randrange(7, 21), rng.choice([0, 15, 30, 45]),
+                rng.choice([15, 30, 45, 60, 90]), f"Meeting {created}",
+            ))
+            created += 1
+    return service
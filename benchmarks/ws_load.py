@@ -0,0 +1,413 @@
+"""
+Load test for the /ws/{session_id} endpoint.
+
+Starts the FastAPI app in a subprocess with Runner.run_live replaced by an
+echo agent, then ramps up simulated voice clients. Each client streams 16 kHz
+PCM at real-time pace in the same frames app.js sends, plus a text message
+every few seconds, and times the echoed audio and text replies.
+
+For every concurrency level it reports the end-to-end latency, the server's
+event-loop lag, its RSS per session and the audio frames that never came back.
+
+Run from the repository root:
+    python -m benchmarks.ws_load
+    python -m benchmarks.ws_load --ramp 1 10 50 100 --duration 20 --json
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import socket
+import struct
+import subprocess
+import sys
+import time
+import uuid
+from websockets.asyncio.client import connect
+
+SAMPLE_RATE = 16000
+FRAME_AUDIO_PCM = 0x01
+
+# Each audio chunk starts with its client-local sequence number
+SEQUENCE = struct.Struct("<I")
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+# Server side
+
+
+def read_rss_kib():
+    """Current resident set size of this process in KiB."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except OSError:
+        import resource
+
+        # Peak rather than current RSS, the best the platform offers
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class EchoRunner:
+    """
+    Stand-in for google.adk.runners.Runner that echoes the live requests.
+
+    Opening the stream waits CONNECT_DELAY seconds first, like the real runner
+    waits for the live model connection.
+    """
+
+    CONNECT_DELAY = 0.0
+
+    # Live requests received by all sessions, to measure the send_realtime rate
+    requests = 0
+
+    def __init__(self, app_name, agent, session_service, **kwargs):
+        self.agent = agent
+
+    async def run_live(self, *, session, live_request_queue, run_config=None):
+        from google.adk.events.event import Event
+        from google.genai import types
+
+        await asyncio.sleep(self.CONNECT_DELAY)
+        while True:
+            request = await live_request_queue.get()
+            EchoRunner.requests += 1
+            if request.close:
+                return
+            if request.blob is not None:
+                yield Event(
+                    author=self.agent.name,
+                    partial=True,
+                    content=types.Content(
+                        role="model",
+                        parts=[types.Part(inline_data=types.Blob(
+                            data=request.blob.data, mime_type="audio/pcm;rate=24000"
+                        ))],
+                    ),
+                )
+            elif request.content is not None:
+                text = request.content.parts[0].text
+                yield Event(
+                    author=self.agent.name,
+                    partial=True,
+                    content=types.Content(role="model", parts=[types.Part(text=text)]),
+                )
+                yield Event(author=self.agent.name, turn_complete=True)
+
+
+async def probe_loop_lag(samples, interval=0.01):
+    """Record how late the event loop wakes up from a short sleep."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - start - interval))
+
+
+def serve(port, connect_ms):
+    """Run the app with the echo agent and a /bench/stats endpoint."""
+    import uvicorn
+    import google.adk.runners
+    import main
+    from app.event_manager.tools.utils import override_calendar_service
+    from app.telemetry import active_websockets
+    from .fake_calendar import FakeCalendarService
+
+    EchoRunner.CONNECT_DELAY = connect_ms / 1000
+    # The agent runtime imports Runner when it loads, so patch it where it is defined
+    google.adk.runners.Runner = EchoRunner
+    override_calendar_service(FakeCalendarService())
+
+    lag_samples = []
+
+    async def stats(reset: bool = False):
+        lag = [sample * 1000 for sample in lag_samples]
+        result = {
+            "rss_kib": read_rss_kib(),
+            "live_requests": EchoRunner.requests,
+            "active_websockets": active_websockets._values.get((), 0),
+            "loop_lag_p50_ms": round(percentile(lag, 0.50), 3),
+            "loop_lag_p99_ms": round(percentile(lag, 0.99), 3),
+            "loop_lag_max_ms": round(max(lag, default=0.0), 3),
+        }
+        if reset:
+            lag_samples.clear()
+        return result
+
+    main.app.add_api_route("/bench/stats", stats)
+
+    async def run():
+        server = uvicorn.Server(uvicorn.Config(main.app, port=port, log_level="warning"))
+        probe = asyncio.create_task(probe_loop_lag(lag_samples))
+        try:
+            await server.serve()
+        finally:
+            probe.cancel()
+
+    asyncio.run(run())
+
+
+# Client side
+
+
+class ClientResult:
+    """What one simulated client saw."""
+
+    def __init__(self):
+        self.sent = 0
+        self.received = 0
+        self.frames = 0
+        self.first_audio = None
+        self.audio_latencies = []
+        self.text_latencies = []
+        self.errors = []
+
+
+async def run_client(url, duration, chunk_ms, text_interval, binary):
+    """Stream audio at real-time pace for duration seconds, timing the echoes."""
+    result = ClientResult()
+    opened = time.perf_counter()
+    chunk_bytes = SAMPLE_RATE * chunk_ms // 1000 * 2
+    silence = bytes(chunk_bytes - SEQUENCE.size)
+    sent_at = {}
+    text_sent_at = []
+    done = asyncio.Event()
+
+    async def receive(websocket):
+        async for message in websocket:
+            now = time.perf_counter()
+            if isinstance(message, bytes):
+                if message[0] == FRAME_AUDIO_PCM:
+                    audio = message[1:]
+                else:
+                    continue
+            else:
+                data = json.loads(message)
+                if data.get("mime_type") == "text/plain":
+                    if text_sent_at:
+                        result.text_latencies.append(now - text_sent_at.pop(0))
+                    continue
+                if data.get("mime_type") != "audio/pcm":
+                    continue
+                audio = base64.b64decode(data["data"])
+            result.frames += 1
+            if result.first_audio is None:
+                result.first_audio = now - opened
+            # The server may merge several echoed chunks into one frame
+            for offset in range(0, len(audio) - SEQUENCE.size + 1, chunk_bytes):
+                start = sent_at.pop(SEQUENCE.unpack_from(audio, offset)[0], None)
+                if start is not None:
+                    result.received += 1
+                    result.audio_latencies.append(now - start)
+            if done.is_set() and not sent_at:
+                return
+
+    async def send(websocket):
+        interval = chunk_ms / 1000
+        start = time.perf_counter()
+        next_text = start + text_interval
+        sequence = 0
+        while time.perf_counter() - start < duration:
+            audio = SEQUENCE.pack(sequence) + silence
+            sent_at[sequence] = time.perf_counter()
+            if binary:
+                await websocket.send(bytes((FRAME_AUDIO_PCM,)) + audio)
+            else:
+                await websocket.send(json.dumps({
+                    "mime_type": "audio/pcm",
+                    "data": base64.b64encode(audio).decode("ascii"),
+                }))
+            result.sent += 1
+            sequence += 1
+
+            if text_interval and time.perf_counter() >= next_text:
+                text_sent_at.append(time.perf_counter())
+                await websocket.send(json.dumps({
+                    "mime_type": "text/plain", "data": "What is on my calendar today?", "role": "user",
+                }))
+                next_text += text_interval
+
+            # Keep to the schedule; if we fell behind, send the next chunk at once
+            delay = start + sequence * interval - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        done.set()
+
+    try:
+        async with connect(url, max_size=None) as websocket:
+            receiver = asyncio.create_task(receive(websocket))
+            await send(websocket)
+            # Give the last echoes a moment to arrive, the rest count as dropped
+            try:
+                await asyncio.wait_for(receiver, timeout=2.0)
+            except asyncio.TimeoutError:
+                pass
+    except Exception as e:
+        result.errors.append(repr(e))
+    return result
+
+
+async def fetch_stats(port, reset=False):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    query = "?reset=true" if reset else ""
+    writer.write(f"GET /bench/stats{query} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n".encode())
+    response = await reader.read()
+    writer.close()
+    return json.loads(response.split(b"\r\n\r\n", 1)[1])
+
+
+async def run_stage(port, clients, args):
+    base = f"ws://127.0.0.1:{port}/ws"
+    query = "is_audio=true&binary=true" if not args.json_frames else "is_audio=true"
+    before = await fetch_stats(port, reset=True)
+
+    # Sample RSS halfway through, while every client is connected and streaming
+    async def fetch_midway():
+        await asyncio.sleep(args.duration / 2)
+        return await fetch_stats(port)
+
+    client_lag = []
+    probe = asyncio.create_task(probe_loop_lag(client_lag))
+    midway = asyncio.create_task(fetch_midway())
+    results = await asyncio.gather(*(
+        run_client(
+            f"{base}/load-{clients}-{i}-{uuid.uuid4().hex[:8]}?{query}",
+            args.duration, args.chunk_ms, args.text_interval, not args.json_frames,
+        )
+        for i in range(clients)
+    ))
+    probe.cancel()
+    during = await midway
+    # Let the server finish tearing the sessions down before counting what is left open
+    await asyncio.sleep(0.5)
+    server = await fetch_stats(port)
+
+    audio = [latency * 1000 for r in results for latency in r.audio_latencies]
+    text = [latency * 1000 for r in results for latency in r.text_latencies]
+    first_audio = [r.first_audio * 1000 for r in results if r.first_audio is not None]
+    sent = sum(r.sent for r in results)
+    received = sum(r.received for r in results)
+    return {
+        "clients": clients,
+        "audio_p50_ms": round(percentile(audio, 0.50), 2),
+        "audio_p99_ms": round(percentile(audio, 0.99), 2),
+        "text_p50_ms": round(percentile(text, 0.50), 2),
+        "first_audio_p50_ms": round(percentile(first_audio, 0.50), 2),
+        "first_audio_p99_ms": round(percentile(first_audio, 0.99), 2),
+        "server_lag_p99_ms": server["loop_lag_p99_ms"],
+        "server_lag_max_ms": server["loop_lag_max_ms"],
+        "rss_mib": round(during["rss_kib"] / 1024, 1),
+        "rss_per_session_kib": round((during["rss_kib"] - before["rss_kib"]) / clients, 1),
+        "frames_sent": sent,
+        "frames_received": sum(r.frames for r in results),
+        "live_requests": server["live_requests"] - before["live_requests"],
+        "dropped_pct": round(100 * (sent - received) / sent, 2) if sent else 0.0,
+        "client_lag_max_ms": round(max(client_lag, default=0.0) * 1000, 2),
+        "open_after": server["active_websockets"],
+        "errors": [error for r in results for error in r.errors][:5],
+    }
+
+
+def print_stage(stage):
+    print(
+        f"{stage['clients']:>5} clients  audio p50 {stage['audio_p50_ms']:>8.2f} ms  "
+        f"p99 {stage['audio_p99_ms']:>8.2f} ms  first audio p50 {stage['first_audio_p50_ms']:>8.2f} ms  "
+        f"text p50 {stage['text_p50_ms']:>7.2f} ms  "
+        f"lag p99 {stage['server_lag_p99_ms']:>7.2f} ms  max {stage['server_lag_max_ms']:>7.2f} ms  "
+        f"rss {stage['rss_mib']:>7.1f} MiB ({stage['rss_per_session_kib']:>7.1f} KiB/session)  "
+        f"frames out {stage['frames_sent']:>7}  live requests {stage['live_requests']:>7}  "
+        f"frames in {stage['frames_received']:>7}  dropped {stage['dropped_pct']:>5.2f}%",
+        flush=True,
+    )
+    if stage["client_lag_max_ms"] > 50:
+        print(f"      client event loop lagged {stage['client_lag_max_ms']} ms, "
+              "the load generator itself may be the bottleneck")
+    for error in stage["errors"]:
+        print(f"      error: {error}")
+
+
+def wait_for_port(port, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Server exited during startup")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server did not listen on port {port} within {timeout}s")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run_ramp(port, args):
+    idle = await fetch_stats(port)
+    stages = []
+    for clients in args.ramp:
+        stage = await run_stage(port, clients, args)
+        print_stage(stage)
+        stages.append(stage)
+    return {"idle_rss_kib": idle["rss_kib"], "stages": stages}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ramp", type=int, nargs="+", default=[1, 5, 10, 25, 50],
+                        help="number of concurrent clients at each stage")
+    parser.add_argument("--duration", type=float, default=10.0,
+                        help="seconds each client streams audio for")
+    parser.add_argument("--chunk-ms", type=int, default=80,
+                        help="audio per frame, 80 ms like app.js; 8 for one frame per render quantum")
+    parser.add_argument("--text-interval", type=float, default=2.0,
+                        help="seconds between text messages, 0 to send none")
+    parser.add_argument("--json-frames", action="store_true",
+                        help="send Base64 audio in JSON instead of binary frames")
+    parser.add_argument("--connect-ms", type=float, default=0.0,
+                        help="simulated live model connection time")
+    parser.add_argument("--warm-pool", type=int, default=0,
+                        help="SCHEDULEAI_WARM_POOL_SIZE for the server")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port, args.connect_ms)
+        return 0
+
+    port = args.port or free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.ws_load", "--serve", "--port", str(port),
+         "--connect-ms", str(args.connect_ms)],
+        env={
+            **os.environ,
+            "LOG_LEVEL": os.getenv("LOG_LEVEL", "WARNING"),
+            "SCHEDULEAI_WARM_POOL_SIZE": str(args.warm_pool),
+        },
+    )
+    try:
+        wait_for_port(port, server)
+        results = asyncio.run(run_ramp(port, args))
+    finally:
+        server.terminate()
+        server.wait()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
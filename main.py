@@ -1,155 +1,327 @@
 import asyncio
 import base64
+import contextlib
+import functools
 import json
 import os
+import threading
+import time
 from pathlib import Path
-from typing import AsyncIterable
+from typing import TYPE_CHECKING, AsyncIterable
 from dotenv import load_dotenv
-from fastapi import FastAPI, Query, WebSocket
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
-from google.adk.agents import LiveRequestQueue
-from google.adk.agents.run_config import RunConfig
-from google.adk.events.event import Event
-from google.adk.runners import Runner
-from google.adk.sessions.in_memory_session_service import InMemorySessionService
-from google.genai import types
-from app.event_manager.agent import root_agent
+from starlette.websockets import WebSocketState
+from app.live_pool import WarmPool
+from app.streaming import FRAME_AUDIO_PCM, AudioAccumulator, ClientWriter
+from app.telemetry import (
+    TrafficLog,
+    active_websockets,
+    count_bytes,
+    get_logger,
+    registry,
+    session_bytes,
+    setup_logging,
+    time_to_first_audio,
+)
+
+if TYPE_CHECKING:
+    from google.adk.agents import LiveRequestQueue
+    from google.adk.events.event import Event
 
 load_dotenv()
+setup_logging()
+logger = get_logger("server")
 
 APP_NAME = "ScheduleAI"
-session_service = InMemorySessionService()
 
-def start_agent_session(session_id, is_audio=False):
-    """Starts an agent session"""
+# Longest a new session waits for the calendar timezone on a cold process before using the default
+TIMEZONE_WAIT = float(os.getenv("SCHEDULEAI_TIMEZONE_WAIT", "2"))
+
+
+class AgentRuntime:
+    """
+    The agent and what runs it: session service, Runner and response settings.
+
+    google.adk and google.genai take seconds to import, so none of this is
+    built when the server module is imported. Startup loads it on a worker
+    thread while the server already answers requests, and a client that
+    connects before it is ready waits for it.
+    """
+
+    def __init__(self):
+        from google.adk.agents import LiveRequestQueue
+        from google.adk.agents.run_config import RunConfig
+        from google.adk.runners import Runner
+        from google.genai import types
+        from app.event_manager.agent import root_agent
+        from app.event_manager.tools.calendar_metadata import calendar_metadata
+        from app.event_manager.tools.executor import get_tool_executor
+        from app.event_manager.tools.prefetch import load_calendar_timezone, prefetch_calendar
+        from app.sessions import SqliteSessionService, create_session_service
+
+        self.LiveRequestQueue = LiveRequestQueue
+        self.get_tool_executor = get_tool_executor
+        self.calendar_metadata = calendar_metadata
+        self.load_calendar_timezone = load_calendar_timezone
+        self.prefetch_calendar = prefetch_calendar
+        self.session_service = create_session_service()
+        # SQLite reads and writes block, so that store is called on a worker thread.
+        # The in-memory store is left on the event loop, where the Runner appends to it
+        self.session_service_blocks = isinstance(self.session_service, SqliteSessionService)
+        self.runner = Runner(
+            app_name=APP_NAME,
+            agent=root_agent,
+            session_service=self.session_service,
+        )
 
-    # Create a Session
-    session = session_service.create_session(
-        app_name=APP_NAME,
-        user_id=session_id,
-        session_id=session_id,
-    )
+        # Response settings for each modality, built once and shared by every session
+        speech_config = types.SpeechConfig(
+            voice_config=types.VoiceConfig(
+                prebuilt_voice_config=types.PrebuiltVoiceConfig(voice_name="Charon")
+            )
+        )
+        self.run_configs = {
+            True: RunConfig(
+                response_modalities=["AUDIO"],
+                speech_config=speech_config,
+                output_audio_transcription={},
+            ),
+            False: RunConfig(response_modalities=["TEXT"], speech_config=speech_config),
+        }
+
+    async def call_session_service(self, method, session_id, **kwargs):
+        """
+        Call a session service method for a session, without blocking the event loop.
+
+        Args:
+            method (str): Name of the method, e.g. "get_session"
+            session_id (str): The session, which is also its user id
+
+        Returns:
+            Whatever the method returns
+        """
+        call = functools.partial(
+            getattr(self.session_service, method),
+            app_name=APP_NAME,
+            user_id=session_id,
+            session_id=session_id,
+            **kwargs,
+        )
+        if self.session_service_blocks:
+            return await asyncio.to_thread(call)
+        return call()
 
-    # Create a Runner
-    runner = Runner(
-        app_name=APP_NAME,
-        agent=root_agent,
-        session_service=session_service,
-    )
 
-    # Set response modality
-    modality = "AUDIO" if is_audio else "TEXT"
+_runtime = None
+_runtime_lock = threading.Lock()
 
-    # Speech config
-    speech_config = types.SpeechConfig(
-        voice_config=types.VoiceConfig(
-            prebuilt_voice_config=types.PrebuiltVoiceConfig(voice_name="Charon")
-        )
-    )
 
-    config = {"response_modalities": [modality], "speech_config": speech_config}
+def get_runtime():
+    """Get the agent runtime, importing and building it on first use."""
+    global _runtime
+    if _runtime is None:
+        with _runtime_lock:
+            if _runtime is None:
+                started = time.perf_counter()
+                _runtime = AgentRuntime()
+                logger.info(
+                    "agent runtime loaded",
+                    extra={"seconds": round(time.perf_counter() - started, 3)},
+                )
+    return _runtime
+
 
-    if is_audio:
-        config["output_audio_transcription"] = {}
+async def load_runtime():
+    """Get the agent runtime without blocking the event loop while it loads."""
+    if _runtime is not None:
+        return _runtime
+    return await asyncio.get_running_loop().run_in_executor(None, get_runtime)
 
-    run_config = RunConfig(**config)
 
-    live_request_queue = LiveRequestQueue()
+async def start_agent_session(session_id, is_audio=False, session=None):
+    """Starts an agent session, resuming the given stored session or creating a new one"""
+    runtime = get_runtime()
+    if session is None:
+        session = await runtime.call_session_service("create_session", session_id)
+    await runtime.call_session_service("connect", session_id)
+
+    live_request_queue = runtime.LiveRequestQueue()
 
     # Start agent session
-    live_events = runner.run_live(
+    live_events = runtime.runner.run_live(
         session=session,
         live_request_queue=live_request_queue,
-        run_config=run_config,
+        run_config=runtime.run_configs[is_audio],
     )
     return live_events, live_request_queue
 
 
-async def agent_to_client_messaging(
-    websocket: WebSocket, live_events: AsyncIterable[Event | None]
-):
-    """Agent to client communication"""
-    while True:
-        async for event in live_events:
-            if event is None:
-                continue
+_timezone_loading = None
 
-            if event.turn_complete or event.interrupted:
-                message = {
-                    "turn_complete": event.turn_complete,
-                    "interrupted": event.interrupted,
-                }
-                await websocket.send_text(json.dumps(message))
-                print(f"[AGENT TO CLIENT]: {message}")
-                continue
 
-            part = event.content and event.content.parts and event.content.parts[0]
-            if not part:
-                continue
+async def load_calendar_timezone(runtime):
+    """Waits briefly for the calendar timezone if it was never loaded, for the instruction of new sessions"""
+    global _timezone_loading
+    if runtime.calendar_metadata.has_timezone():
+        return
 
-            if not isinstance(part, types.Part):
-                continue
+    # One load is shared by every connection waiting for it. It runs on the
+    # default executor, not behind tool calls, and may block on authentication,
+    # so connections stop waiting after TIMEZONE_WAIT and use the default timezone
+    if _timezone_loading is None or _timezone_loading.done():
+        _timezone_loading = asyncio.get_running_loop().run_in_executor(
+            None, runtime.load_calendar_timezone
+        )
+    try:
+        await asyncio.wait_for(asyncio.shield(_timezone_loading), TIMEZONE_WAIT)
+    except asyncio.TimeoutError:
+        logger.warning("calendar timezone not loaded in time, using the default")
 
-            if part.text and event.partial:
-                message = {
-                    "mime_type": "text/plain",
-                    "data": part.text,
-                    "role": "model",
-                }
-                await websocket.send_text(json.dumps(message))
-                print(f"[AGENT TO CLIENT]: text/plain: {part.text}")
-
-            # If it's audio, send Base64 encoded audio data
-            is_audio = (
-                part.inline_data
-                and part.inline_data.mime_type
-                and part.inline_data.mime_type.startswith("audio/pcm")
-            )
-            if is_audio:
-                audio_data = part.inline_data and part.inline_data.data
-                if audio_data:
-                    message = {
-                        "mime_type": "audio/pcm",
-                        "data": base64.b64encode(audio_data).decode("ascii"),
-                        "role": "model",
-                    }
-                    await websocket.send_text(json.dumps(message))
-                    print(f"[AGENT TO CLIENT]: audio/pcm: {len(audio_data)} bytes.")
 
+async def end_agent_session(session_id):
+    """Ends an agent session; the in-memory store deletes it, SQLite keeps it to resume"""
+    await get_runtime().call_session_service("disconnect", session_id)
 
-async def client_to_agent_messaging(
-    websocket: WebSocket, live_request_queue: LiveRequestQueue
+
+# Audio sessions started ahead of time, see SCHEDULEAI_WARM_POOL_SIZE
+warm_pool = WarmPool(
+    start=functools.partial(start_agent_session, is_audio=True),
+    release=end_agent_session,
+)
+
+
+async def agent_to_client_messaging(
+    writer: ClientWriter,
+    live_events: AsyncIterable["Event | None"],
+    session_id="",
+    connected_at=None,
+    warm=False,
 ):
-    """Client to agent communication"""
-    while True:
-        # Decode JSON message
-        message_json = await websocket.receive_text()
-        message = json.loads(message_json)
-        mime_type = message["mime_type"]
-        data = message["data"]
-        role = message.get("role", "user") 
-
-        # Send the message to the agent
-        if mime_type == "text/plain":
-            # Send a text message
-            content = types.Content(role=role, parts=[types.Part.from_text(text=data)])
-            live_request_queue.send_content(content=content)
-            print(f"[CLIENT TO AGENT PRINT]: {data}")
-        elif mime_type == "audio/pcm":
-            # Send audio data
-            decoded_data = base64.b64decode(data)
-
-            live_request_queue.send_realtime(
-                types.Blob(data=decoded_data, mime_type=mime_type)
+    """Agent to client communication"""
+    from google.genai import types
+
+    async for event in live_events:
+        if event is None:
+            continue
+
+        if event.turn_complete or event.interrupted:
+            message = {
+                "turn_complete": event.turn_complete,
+                "interrupted": event.interrupted,
+            }
+            writer.send_control(message)
+            logger.info("agent to client", extra={"session_id": session_id, **message})
+            continue
+
+        part = event.content and event.content.parts and event.content.parts[0]
+        if not part:
+            continue
+
+        if not isinstance(part, types.Part):
+            continue
+
+        if part.text and event.partial:
+            writer.send_text(part.text)
+            logger.debug(
+                "agent to client text",
+                extra={"session_id": session_id, "text": part.text},
             )
-            print(f"[CLIENT TO AGENT]: audio/pcm: {len(decoded_data)} bytes")
 
-        else:
-            raise ValueError(f"Mime type not supported: {mime_type}")
+        # If it's audio, queue it for the writer, which batches it into larger frames
+        is_audio = (
+            part.inline_data
+            and part.inline_data.mime_type
+            and part.inline_data.mime_type.startswith("audio/pcm")
+        )
+        if is_audio:
+            audio_data = part.inline_data and part.inline_data.data
+            if audio_data and connected_at is not None:
+                time_to_first_audio.observe(
+                    time.monotonic() - connected_at, warm=str(warm).lower()
+                )
+                connected_at = None
+            if audio_data:
+                writer.send_audio(audio_data)
+
+    # Deliver what is still queued before the session is torn down
+    await writer.flush()
+    logger.info("live stream ended", extra={"session_id": session_id})
+
 
+async def client_to_agent_messaging(
+    websocket: WebSocket, live_request_queue: "LiveRequestQueue", session_id=""
+):
+    """Client to agent communication"""
+    from google.genai import types
+
+    audio_log = TrafficLog(logger, "client_to_agent", session_id)
+    # Collects small audio frames into larger blobs for the model
+    audio = AudioAccumulator(live_request_queue)
+    try:
+        while True:
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(frame.get("code", 1000))
+
+            # Binary frames carry raw audio after a one byte header
+            if frame.get("bytes") is not None:
+                payload = frame["bytes"]
+                count_bytes(session_id, "in", len(payload))
+                if not payload or payload[0] != FRAME_AUDIO_PCM:
+                    raise ValueError(f"Binary frame type not supported: {payload[:1]!r}")
+                audio.add(memoryview(payload)[1:])
+                audio_log.add(len(payload) - 1)
+                continue
 
-app = FastAPI()
+            # Decode JSON message
+            count_bytes(session_id, "in", len(frame["text"]))
+            message = json.loads(frame["text"])
+            mime_type = message["mime_type"]
+            data = message["data"]
+            role = message.get("role", "user") 
+
+            # Send the message to the agent
+            if mime_type == "text/plain":
+                # Send a text message
+                content = types.Content(role=role, parts=[types.Part.from_text(text=data)])
+                audio.flush()
+                live_request_queue.send_content(content=content)
+                audio_log.flush()
+                logger.debug(
+                    "client to agent text", extra={"session_id": session_id, "text": data}
+                )
+            elif mime_type == "audio/pcm":
+                # Send audio data
+                decoded_data = base64.b64decode(data)
+                audio.add(decoded_data)
+                audio_log.add(len(decoded_data))
+
+            else:
+                raise ValueError(f"Mime type not supported: {mime_type}")
+    finally:
+        # The live request queue is closed after this, the timer must not send into it
+        audio.close()
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    """Loads the agent and fills the warm pool in the background, and closes the pool on shutdown"""
+
+    async def load():
+        runtime = await load_runtime()
+        if warm_pool.size:
+            await load_calendar_timezone(runtime)
+        warm_pool.fill()
+
+    loading = asyncio.create_task(load())
+    yield
+    loading.cancel()
+    await warm_pool.close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 STATIC_DIR = Path("app/static")
 app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
@@ -159,28 +331,108 @@ async def root():
     """Serves the index.html"""
     return FileResponse(os.path.join(STATIC_DIR, "index.html"))
 
+@app.get("/metrics")
+async def metrics():
+    """Serves the metrics in the Prometheus text format"""
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4"
+    )
+
 @app.websocket("/ws/{session_id}")
 async def websocket_endpoint(
     websocket: WebSocket,
     session_id: str,
     is_audio: str = Query(...),
+    binary: str = Query("false"),
 ):
     """Client websocket endpoint"""
 
     await websocket.accept()
-    print(f"Client #{session_id} connected, audio mode: {is_audio}")
-
-    # Start agent session
-    live_events, live_request_queue = start_agent_session(
-        session_id, is_audio == "true"
+    connected_at = time.monotonic()
+    active_websockets.inc()
+    logger.info(
+        "client connected",
+        extra={"session_id": session_id, "is_audio": is_audio, "binary": binary},
     )
 
-    agent_to_client_task = asyncio.create_task(
-        agent_to_client_messaging(websocket, live_events)
-    )
-    client_to_agent_task = asyncio.create_task(
-        client_to_agent_messaging(websocket, live_request_queue)
-    )
-    await asyncio.gather(agent_to_client_task, client_to_agent_task)
+    # Anything below can fail, so teardown only undoes what was set up
+    warm = live_events = live_request_queue = None
+    agent_session_id = None
+    tasks = []
+    try:
+        # Only waits if the client connected while the server was still starting
+        runtime = await load_runtime()
+
+        # The agent's instruction is built with the calendar timezone when the session opens
+        await load_calendar_timezone(runtime)
+
+        # Load calendar metadata and the coming week in the background, so the
+        # tools find them in memory
+        asyncio.get_running_loop().run_in_executor(
+            runtime.get_tool_executor(), runtime.prefetch_calendar
+        )
+
+        # A client resuming a stored session gets that session; anyone else gets
+        # an already connected one from the pool if possible
+        session = await runtime.call_session_service("get_session", session_id)
+        if is_audio == "true" and session is None:
+            warm = await warm_pool.take()
+        if warm:
+            agent_session_id = warm.session_id
+            live_events, live_request_queue = warm.events(), warm.live_request_queue
+            logger.info(
+                "using warm session",
+                extra={"session_id": session_id, "agent_session_id": agent_session_id},
+            )
+        else:
+            agent_session_id = session_id
+            live_events, live_request_queue = await start_agent_session(
+                session_id, is_audio == "true", session
+            )
 
-    print(f"Client #{session_id} disconnected")
\ No newline at end of file
+        writer = ClientWriter(websocket, binary == "true", session_id)
+        writer_task = asyncio.create_task(writer.run())
+        agent_to_client_task = asyncio.create_task(
+            agent_to_client_messaging(
+                writer, live_events, session_id, connected_at, warm is not None
+            )
+        )
+        client_to_agent_task = asyncio.create_task(
+            client_to_agent_messaging(websocket, live_request_queue, session_id)
+        )
+        tasks = [agent_to_client_task, client_to_agent_task, writer_task]
+
+        # Any task finishing ends the session: the client left, the stream ended or a send failed
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            error = task.exception()
+            if error and not isinstance(error, WebSocketDisconnect):
+                logger.error(
+                    "session failed",
+                    extra={"session_id": session_id},
+                    exc_info=error,
+                )
+    finally:
+        # Tear down: stop the tasks, the model connection and the session. The
+        # queue is closed once the tasks have finished, so nothing sends into it after
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if live_request_queue is not None:
+            live_request_queue.close()
+        if live_events is not None:
+            await live_events.aclose()
+        if warm:
+            await warm.close()
+        if agent_session_id is not None:
+            await end_agent_session(agent_session_id)
+        if websocket.client_state == WebSocketState.CONNECTED:
+            try:
+                await websocket.close()
+            except RuntimeError:
+                pass
+
+        active_websockets.dec()
+        session_bytes.remove(session_id=session_id, direction="in")
+        session_bytes.remove(session_id=session_id, direction="out")
+        logger.info("client disconnected", extra={"session_id": session_id})
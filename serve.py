@@ -0,0 +1,40 @@
+"""
+Run ScheduleAI with several worker processes.
+
+Each worker is a separate uvicorn process with its own event loop, so CPU
+bound work in one (JSON, Base64, tool calls) does not hold up connections
+in another. The workers share the OAuth token through a lock file, and
+calendar data and sessions through SQLite files, which this script turns
+on unless they are already configured.
+
+Usage:
+    python serve.py
+    python serve.py --workers 4 --port 8000
+"""
+import argparse
+import os
+import uvicorn
+
+# Where the shared cache and session databases go unless configured otherwise
+STATE_DIR = ".scheduleai"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    # Set before the workers start, so every one of them inherits the same files
+    os.makedirs(STATE_DIR, exist_ok=True)
+    os.environ.setdefault("SCHEDULEAI_CACHE_DB", os.path.join(STATE_DIR, "cache.db"))
+    os.environ.setdefault("SCHEDULEAI_SESSION_STORE", "sqlite")
+    os.environ.setdefault("SCHEDULEAI_SESSION_DB", os.path.join(STATE_DIR, "sessions.db"))
+
+    uvicorn.run("main:app", host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()